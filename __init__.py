@@ -30,6 +30,7 @@ class MeshGenerationPanel(bpy.types.Panel):
         col = layout.column(align=True)
         col.operator("cynthia.add_floorplan")
         col.operator("cynthia.add_floors")
+        col.operator("cynthia.import_footprints")
 
         row = col.row(align=True)
         row.operator("cynthia.add_window")
@@ -0,0 +1,79 @@
+"""
+Benchmark for mass generation of random floorplans, runs with plain python (no Blender):
+
+    python benchmarks/bench_floorplan.py --lots 10000 --workers 4 --out bench_floorplan.json
+
+The outlines of --lots random lots (seed, width, length) are generated with
+utils/util_floorplan.py, once by calling random_coords in a loop and once through
+random_coords_many on a process pool, and the two outputs compared.
+"""
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import importlib.util
+
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_floorplan():
+    """Import util_floorplan on its own, the utils package pulls in bpy"""
+    spec = importlib.util.spec_from_file_location(
+        "util_floorplan", os.path.join(ADDON_DIR, "utils", "util_floorplan.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["util_floorplan"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_lots(count, seed=0):
+    """(seed, width, length) of count lots, sizes as the floorplan panel allows"""
+    rng = random.Random(seed)
+    return [(rng.randrange(1 << 30), rng.uniform(2, 20), rng.uniform(2, 20)) for _ in range(count)]
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lots", type=int, default=10000)
+    parser.add_argument("--workers", type=int, default=None, help="processes, default the cpu count")
+    parser.add_argument("--chunksize", type=int, default=256)
+    parser.add_argument("--out", default="bench_floorplan.json")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    floorplan = load_floorplan()
+    lots = make_lots(args.lots)
+
+    start = time.perf_counter()
+    serial = [floorplan.random_coords(*lot) for lot in lots]
+    serial_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    pooled = list(floorplan.random_coords_many(lots, args.workers, args.chunksize))
+    pool_seconds = time.perf_counter() - start
+
+    same = serial == pooled
+    print("{} lots: {:.3f}s serial, {:.3f}s on {} workers, {}".format(
+        len(lots), serial_seconds, pool_seconds, args.workers or os.cpu_count(),
+        "same output" if same else "OUTPUT DIFFERS"))
+    with open(args.out, "w") as fp:
+        json.dump({
+            "python": platform.python_version(),
+            "lots": len(lots),
+            "workers": args.workers or os.cpu_count(),
+            "serial": serial_seconds,
+            "pool": pool_seconds,
+            "same": same,
+        }, fp, indent=2)
+    if not same:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,374 @@
+"""
+Headless benchmark for the cynthia.* operators
+
+Builds parameterised scenes and times each builder, no GPU needed:
+
+    blender --background --factory-startup --python benchmarks/bench_operators.py -- \
+        --floors 1 4 16 --faces 1 16 64 --lengths 2 10 50 --out bench_operators.json
+
+Every record holds the operator, its scale parameters, wall time, face counts
+before/after and memory: the peak of Python allocations during the builder
+(tracemalloc) and the change in resident set size across it. Each scene is
+built twice, once for the timing and once for the memory figures, so the
+timings are not slowed down by tracemalloc.
+
+With --check the run fails if an operator leaves coincident vertices that a
+full-mesh remove_doubles would have merged (the scoped weld missed them).
+
+With --scaling each welding operator is run on one face of buildings of
+growing size (--floors x --lengths) and the time spent in remove_doubles is
+recorded; the scoped weld only looks at the operator's input and changes, so
+the weld time and the number of welded vertices should stay flat as the mesh
+grows.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+import importlib.util
+
+import bpy
+import bmesh
+
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ADDON_NAME = "building_tool"
+
+
+def load_addon():
+    """Import and register the add-on from this checkout"""
+    spec = importlib.util.spec_from_file_location(
+        ADDON_NAME, os.path.join(ADDON_DIR, "__init__.py"),
+        submodule_search_locations=[ADDON_DIR])
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[ADDON_NAME] = module
+    spec.loader.exec_module(module)
+    module.register()
+    return module
+
+
+def reset_scene():
+    """Remove all objects and orphan meshes"""
+    if bpy.context.object and bpy.context.object.mode != 'OBJECT':
+        bpy.ops.object.mode_set(mode='OBJECT')
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj, do_unlink=True)
+    for me in list(bpy.data.meshes):
+        bpy.data.meshes.remove(me)
+
+
+def face_count(obj):
+    if obj.mode == 'EDIT':
+        return len(bmesh.from_edit_mesh(obj.data).faces)
+    return len(obj.data.polygons)
+
+
+def count_doubles(obj, dist=0.0001):
+    """Number of vertices a full-mesh remove_doubles would merge"""
+    if obj.mode == 'EDIT':
+        bm = bmesh.from_edit_mesh(obj.data).copy()
+    else:
+        bm = bmesh.new()
+        bm.from_mesh(obj.data)
+    count = len(bm.verts)
+    bmesh.ops.remove_doubles(bm, verts=list(bm.verts), dist=dist)
+    count -= len(bm.verts)
+    bm.free()
+    return count
+
+
+def rss_kb():
+    """Current resident set size of this process (kB), None where /proc is missing"""
+    try:
+        with open("/proc/self/statm") as fp:
+            pages = int(fp.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") // 1024
+
+
+def select_faces(obj, predicate, limit=None):
+    """Select up to limit faces matching predicate in edit mode, return count"""
+    bm = bmesh.from_edit_mesh(obj.data)
+    for f in bm.faces:
+        f.select = False
+    count = 0
+    for f in bm.faces:
+        if limit is not None and count >= limit:
+            break
+        if predicate(f):
+            f.select = True
+            count += 1
+    bmesh.update_edit_mesh(obj.data, True)
+    return count
+
+
+def is_wall(face):
+    return not round(face.normal.z, 3) and face.calc_area() > 0
+
+
+def is_top(face):
+    return face.normal.z > 0.5
+
+
+def timed(op, obj, trace=False, **props):
+    """Run operator op with props, return timing record
+
+    With trace the record holds memory figures instead of the wall time.
+    """
+    before = face_count(obj) if obj else 0
+    doubles = count_doubles(obj) if obj else 0
+    if trace:
+        rss = rss_kb()
+        tracemalloc.start()
+    start = time.perf_counter()
+    result = op(props=props)
+    elapsed = time.perf_counter() - start
+
+    obj = bpy.context.object
+    rec = {
+        "result": sorted(result),
+        "faces_before": before,
+        "faces_after": face_count(obj),
+    }
+    if trace:
+        _, py_peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        after = rss_kb()
+        rec.update(py_peak_kb=py_peak // 1024,
+                   rss_delta_kb=None if rss is None or after is None else after - rss)
+    else:
+        rec.update(seconds=elapsed, doubles_before=doubles, doubles_after=count_doubles(obj))
+    return rec
+
+
+def make_building(floors, width=10.0, length=10.0):
+    """Floorplan + floors, left in edit mode"""
+    bpy.ops.cynthia.add_floorplan(props={"type": 'RECTANGULAR', "width": width, "length": length})
+    obj = bpy.context.object
+    bpy.ops.object.mode_set(mode='EDIT')
+    select_faces(obj, lambda f: True)
+    bpy.ops.cynthia.add_floors(props={"floor_count": floors})
+    return obj
+
+
+def bench_floorplan(floors, faces, length, trace=False):
+    reset_scene()
+    records = []
+    for fp_type in ('RECTANGULAR', 'CIRCULAR', 'COMPOSITE', 'H-SHAPED', 'RANDOM'):
+        rec = timed(bpy.ops.cynthia.add_floorplan, None, trace,
+                    type=fp_type, width=length, length=length)
+        rec.update(operator="add_floorplan", type=fp_type, length=length)
+        records.append(rec)
+    return records
+
+
+def bench_floors(floors, faces, length, trace=False):
+    reset_scene()
+    bpy.ops.cynthia.add_floorplan(props={"width": length, "length": length})
+    obj = bpy.context.object
+    bpy.ops.object.mode_set(mode='EDIT')
+    select_faces(obj, lambda f: True)
+    rec = timed(bpy.ops.cynthia.add_floors, obj, trace, floor_count=floors)
+    rec.update(operator="add_floors", floors=floors, length=length)
+    return [rec]
+
+
+def _bench_facade(op_name, floors, faces, length, trace=False, **props):
+    reset_scene()
+    obj = make_building(floors, length, length)
+    selected = select_faces(obj, is_wall, faces)
+    rec = timed(getattr(bpy.ops.cynthia, op_name), obj, trace, **props)
+    rec.update(operator=op_name, floors=floors, faces=selected, length=length)
+    return [rec]
+
+
+def bench_window(floors, faces, length, trace=False):
+    return _bench_facade("add_window", floors, faces, length, trace)
+
+
+def bench_door(floors, faces, length, trace=False):
+    return _bench_facade("add_door", floors, faces, length, trace)
+
+
+def bench_balcony(floors, faces, length, trace=False):
+    return _bench_facade("add_balcony", floors, faces, length, trace)
+
+
+def bench_stairs(floors, faces, length, trace=False):
+    return _bench_facade("add_stairs", floors, faces, length, trace)
+
+
+def bench_railing(floors, faces, length, trace=False):
+    records = []
+    for fill in ('POSTS', 'RAILS', 'WALL'):
+        reset_scene()
+        obj = make_building(1, length, length)
+        select_faces(obj, is_top, 1)
+        rec = timed(bpy.ops.cynthia.add_railing, obj, trace, fill=fill)
+        rec.update(operator="add_railing", fill=fill, length=length)
+        records.append(rec)
+    return records
+
+
+def bench_roof(floors, faces, length, trace=False):
+    records = []
+    for roof_type in ('FLAT', 'GABLE', 'HIP'):
+        reset_scene()
+        obj = make_building(floors, length, length)
+        select_faces(obj, is_top, 1)
+        rec = timed(bpy.ops.cynthia.add_roof, obj, trace, type=roof_type)
+        rec.update(operator="add_roof", type=roof_type, floors=floors, length=length)
+        records.append(rec)
+    return records
+
+
+BENCHES = {
+    "floorplan": bench_floorplan,
+    "floors": bench_floors,
+    "window": bench_window,
+    "door": bench_door,
+    "balcony": bench_balcony,
+    "stairs": bench_stairs,
+    "railing": bench_railing,
+    "roof": bench_roof,
+}
+
+# -- scale parameters each benchmark depends on, other combinations are skipped
+BENCH_PARAMS = {
+    "floorplan": ("length",),
+    "floors": ("floors", "length"),
+    "window": ("floors", "faces", "length"),
+    "door": ("floors", "faces", "length"),
+    "balcony": ("floors", "faces", "length"),
+    "stairs": ("floors", "faces", "length"),
+    "railing": ("length",),
+    "roof": ("floors", "length"),
+}
+
+
+def check_scoped_weld(utils):
+    """
+    A touched vertex welds onto a coincident vertex of the input face it is not
+    linked to, a coincident pair away from the input and the changes is left alone
+    """
+    bm = bmesh.new()
+    face = bm.faces.new([bm.verts.new(co) for co in ((0, 0, 0), (1, 0, 0), (1, 1, 0))])
+    bm.verts.new((5, 0, 0))
+    bm.verts.new((5, 0, 0.00005))
+    with utils.track_changes(bm, [face]):
+        utils.touch_verts(bm, [bm.verts.new((0, 0, 0.00005))])
+        utils.weld_verts(bm)
+    count = len(bm.verts)
+    bm.free()
+    return count == 5
+
+
+# -- operators that weld, with the faces they are placed on
+WELD_OPS = {
+    "add_window": is_wall,
+    "add_door": is_wall,
+    "add_railing": is_top,
+}
+
+
+def weld_scaling(utils, floors, lengths):
+    """Time spent in remove_doubles by one operator call on buildings of growing size"""
+    recorder = utils.enable_profiling()
+    records = []
+    try:
+        for op_name, predicate in sorted(WELD_OPS.items()):
+            for length in lengths:
+                for count in floors:
+                    reset_scene()
+                    obj = make_building(count, length, length)
+                    select_faces(obj, predicate, 1)
+                    mesh_verts = len(bmesh.from_edit_mesh(obj.data).verts)
+                    recorder.clear()
+                    getattr(bpy.ops.cynthia, op_name)(props={})
+                    welds = [r for r in recorder.records if r['stage'] == 'remove_doubles']
+                    records.append({
+                        "operator": op_name, "floors": count, "length": length,
+                        "mesh_verts": mesh_verts,
+                        "welds": len(welds),
+                        "weld_verts": sum(r.get('verts', 0) for r in welds),
+                        "weld_seconds": sum(r['seconds'] for r in welds),
+                    })
+    finally:
+        utils.disable_profiling()
+    return records
+
+
+def parse_args(argv):
+    argv = argv[argv.index("--") + 1:] if "--" in argv else []
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--floors", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--faces", type=int, nargs="+", default=[1, 16, 64],
+                        help="number of selected facade faces")
+    parser.add_argument("--lengths", type=float, nargs="+", default=[2.0, 10.0, 50.0],
+                        help="floorplan / railing edge length")
+    parser.add_argument("--only", nargs="+", choices=sorted(BENCHES), default=sorted(BENCHES))
+    parser.add_argument("--out", default="bench_operators.json")
+    parser.add_argument("--check", action="store_true",
+                        help="fail if an operator leaves vertices a full weld would merge")
+    parser.add_argument("--scaling", action="store_true",
+                        help="record the weld time of one operator call as the mesh grows")
+    return parser.parse_args(argv)
+
+
+def run(args):
+    records = []
+    for name in args.only:
+        done = set()
+        for floors in args.floors:
+            for faces in args.faces:
+                for length in args.lengths:
+                    scale = dict(floors=floors, faces=faces, length=length)
+                    key = tuple(scale[p] for p in BENCH_PARAMS[name])
+                    if key in done:
+                        continue
+                    done.add(key)
+                    try:
+                        timing = BENCHES[name](floors, faces, length)
+                        memory = BENCHES[name](floors, faces, length, trace=True)
+                        for rec, mem in zip(timing, memory):
+                            rec.update(py_peak_kb=mem["py_peak_kb"], rss_delta_kb=mem["rss_delta_kb"])
+                        records.extend(timing)
+                    except Exception as e:
+                        records.append({"operator": name, "floors": floors, "faces": faces,
+                                        "length": length, "error": repr(e)})
+    return records
+
+
+def main():
+    args = parse_args(sys.argv)
+    addon = load_addon()
+    records = run(args)
+    scaling = weld_scaling(addon.utils, args.floors, args.lengths) if args.scaling else None
+    with open(args.out, "w") as fp:
+        json.dump({
+            "blender": bpy.app.version_string,
+            "python": platform.python_version(),
+            "records": records,
+            "weld_scaling": scaling,
+        }, fp, indent=2)
+    print("wrote {} records to {}".format(len(records), args.out))
+    for rec in scaling or ():
+        print("{operator:<12} mesh verts {mesh_verts:>7}  welded {weld_verts:>5} verts "
+              "in {weld_seconds:.5f}s".format(**rec))
+
+    if args.check:
+        missed = [r for r in records if r.get("doubles_after", 0) > r.get("doubles_before", 0)]
+        for r in missed:
+            print("missed welds: {}".format(r))
+        weld_ok = check_scoped_weld(addon.utils)
+        print("scoped weld check: {}".format("ok" if weld_ok else "FAILED"))
+        if missed or not weld_ok or any("error" in r for r in records):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+"""
+Scaling benchmark for utils/util_skeleton.py, runs with plain python (no Blender):
+
+    python benchmarks/bench_skeleton.py --sizes 4 16 64 256 1024 5000 --out bench_skeleton.json
+
+Every corpus kind (convex, star, jagged, holes) is generated from a seed at each size,
+skeletonize is timed on it and its output checked against invariants:
+
+    sinks      every polygon vertex is a sink of some subtree
+    monotonic  subtree heights never decrease in output order
+    bounds     sources lie inside the bounding box of the polygon, heights are positive
+
+For each kind the growth of runtime with vertex count is reported as the exponent k
+of a least squares fit seconds ~ n^k.
+
+The offset contours of a few fixed shapes are checked as well (OFFSET_CASES): their
+number and that none of them crosses itself; the run exits with status 1 if one fails.
+
+With --workers the whole corpus of each kind is also run through skeletonize_many on a
+process pool of that many workers, timed against the same polygons in one process.
+"""
+import os
+import sys
+import json
+import math
+import time
+import random
+import argparse
+import platform
+import importlib.util
+
+ADDON_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def load_skeleton():
+    """Import util_skeleton on its own, the utils package pulls in bpy"""
+    spec = importlib.util.spec_from_file_location(
+        "util_skeleton", os.path.join(ADDON_DIR, "utils", "util_skeleton.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules["util_skeleton"] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+# -- corpora, outer contours clockwise and holes counter-clockwise as skeletonize expects (y up)
+
+def convex(n, rng):
+    """n points on an ellipse at random angles"""
+    angles = sorted(rng.sample(range(n * 16), n))
+    rx, ry = rng.uniform(5, 20), rng.uniform(5, 20)
+    pts = [(rx * math.cos(2 * math.pi * a / (n * 16)), ry * math.sin(2 * math.pi * a / (n * 16))) for a in angles]
+    return pts[::-1], []
+
+
+def star(n, rng):
+    """n points at even angles with random radius"""
+    pts = []
+    for i in range(n):
+        a = 2 * math.pi * i / n
+        r = rng.uniform(4, 10)
+        pts.append((r * math.cos(a), r * math.sin(a)))
+    return pts[::-1], []
+
+
+def jagged(n, rng):
+    """
+    Rectangle with rectangular tabs pushed out of its sides, like fp_random, four points per tab.
+    """
+    tabs = max(0, (n - 4) // 4)
+    per_side = [tabs // 4 + (1 if i < tabs % 4 else 0) for i in range(4)]
+    width, length = 4.0 * (max(per_side) + 1), 4.0 * (max(per_side) + 1)
+
+    def side(count, size):
+        # non overlapping (start, end, depth) along a side of given size
+        slot = size / (count + 1)
+        result = []
+        for k in range(count):
+            start = slot * (k + 0.5) + rng.uniform(0.1, 0.4) * slot
+            end = start + rng.uniform(0.2, 0.4) * slot
+            result.append((start, end, float(rng.randint(1, 3))))
+        return result
+
+    pts = [(0.0, 0.0)]
+    for s, e, d in side(per_side[0], width):
+        pts += [(s, 0.0), (s, -d), (e, -d), (e, 0.0)]
+    pts.append((width, 0.0))
+    for s, e, d in side(per_side[1], length):
+        pts += [(width, s), (width + d, s), (width + d, e), (width, e)]
+    pts.append((width, length))
+    for s, e, d in side(per_side[2], width):
+        pts += [(width - s, length), (width - s, length + d), (width - e, length + d), (width - e, length)]
+    pts.append((0.0, length))
+    for s, e, d in side(per_side[3], length):
+        pts += [(0.0, length - s), (-d, length - s), (-d, length - e), (0.0, length - e)]
+    return pts[::-1], []
+
+
+def holes(n, rng):
+    """Square with a grid of square holes, n counts all contour points"""
+    count = max(1, (n - 4) // 4)
+    cols = int(math.ceil(math.sqrt(count)))
+    size = 4.0 * cols + 2.0
+    outer = [(0.0, 0.0), (size, 0.0), (size, size), (0.0, size)]
+    result = []
+    for k in range(count):
+        x, y = 2.0 + 4.0 * (k % cols), 2.0 + 4.0 * (k // cols)
+        w, h = rng.uniform(1.0, 2.0), rng.uniform(1.0, 2.0)
+        result.append([(x, y), (x + w, y), (x + w, y + h), (x, y + h)])
+    return outer[::-1], result
+
+
+CORPORA = {
+    "convex": convex,
+    "star": star,
+    "jagged": jagged,
+    "holes": holes,
+}
+
+
+def check(polygon, holes, output):
+    """Count violations of the output invariants"""
+    vertices = {(float(x), float(y)) for contour in [polygon] + holes for x, y in contour}
+    sinks = {(p.x, p.y) for arc in output for p in arc.sinks}
+    xs = [x for x, y in polygon]
+    ys = [y for x, y in polygon]
+    heights = [arc.height for arc in output]
+    tol = 1e-9 * max(1.0, max(xs) - min(xs), max(ys) - min(ys))
+    return {
+        "sinks": len(vertices - sinks),
+        "monotonic": sum(1 for a, b in zip(heights, heights[1:]) if b < a - tol),
+        "bounds": sum(1 for arc in output
+                      if not (min(xs) - tol <= arc.source.x <= max(xs) + tol and
+                              min(ys) - tol <= arc.source.y <= max(ys) + tol and arc.height > 0)),
+    }
+
+
+def dumbbell(neck, gap=2.0):
+    """Two 4x4 squares joined by a neck of width neck, gap long, centred on y=2"""
+    a, b = 5.0 - gap / 2, 5.0 + gap / 2
+    lo, hi = 2.0 - neck / 2, 2.0 + neck / 2
+    pts = [(0.0, 0.0), (a, 0.0), (a, lo), (b, lo), (b, 0.0), (10.0, 0.0),
+           (10.0, 4.0), (b, 4.0), (b, hi), (a, hi), (a, 4.0), (0.0, 4.0)]
+    return pts[::-1]
+
+
+# -- (polygon, distance, number of contours), the reflex corners at each end of the neck meet
+#    head on when the neck closes: the contour has to fall apart into one loop per square
+OFFSET_CASES = {
+    "dumbbell 1.0 at 0.7": (dumbbell(1.0), 0.7, 2),
+    "dumbbell 1.0 at 0.3": (dumbbell(1.0), 0.3, 1),
+    "dumbbell 0.4 at 0.7": (dumbbell(0.4), 0.7, 2),
+    "dumbbell 0.4 long at 0.3": (dumbbell(0.4, 4.0), 0.3, 2),
+    "dumbbell 0.6 at 0.7": (dumbbell(0.6), 0.7, 2),
+}
+
+
+def _crosses(p, q, r, s):
+    """Segments pq and rs cross at a point inside both"""
+    def side(a, b, c):
+        return (b[0] - a[0]) * (c[1] - a[1]) - (b[1] - a[1]) * (c[0] - a[0])
+    d1, d2, d3, d4 = side(r, s, p), side(r, s, q), side(p, q, r), side(p, q, s)
+    return d1 * d2 < 0 and d3 * d4 < 0
+
+
+def self_crossings(contour):
+    """Number of pairs of non adjacent edges of contour that cross"""
+    edges = list(zip(contour, contour[1:] + contour[:1]))
+    n = len(edges)
+    return sum(1 for i in range(n) for j in range(i + 2, n)
+               if (i, j) != (0, n - 1) and _crosses(edges[i][0], edges[i][1], edges[j][0], edges[j][1]))
+
+
+def check_offsets(skeleton):
+    """Run OFFSET_CASES, returns {case: problem or None}"""
+    result = {}
+    for name, (polygon, distance, count) in sorted(OFFSET_CASES.items()):
+        try:
+            contours = skeleton.offset_polygon(polygon, distance)
+        except Exception as e:
+            result[name] = repr(e)
+        else:
+            crossing = sum(self_crossings(c) for c in contours)
+            problems = []
+            if len(contours) != count:
+                problems.append("{} contours, expected {}".format(len(contours), count))
+            if crossing:
+                problems.append("{} self crossings".format(crossing))
+            result[name] = ", ".join(problems) or None
+        print("offset {:<26} {}".format(name, result[name] or "ok"))
+    return result
+
+
+def timed(skeleton, polygon, holes, repeat):
+    """Best of repeat runs, returns (seconds, output)"""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output = skeleton.skeletonize(polygon, holes)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, output
+
+
+def growth(records):
+    """Exponent k of the least squares fit seconds ~ n^k"""
+    pts = [(math.log(r["vertices"]), math.log(r["seconds"])) for r in records
+           if "seconds" in r and r["seconds"] > 0 and r["vertices"] > 0]
+    if len(pts) < 2:
+        return None
+    mx = sum(x for x, _ in pts) / len(pts)
+    my = sum(y for _, y in pts) / len(pts)
+    sxx = sum((x - mx) ** 2 for x, _ in pts)
+    if not sxx:
+        return None
+    return sum((x - mx) * (y - my) for x, y in pts) / sxx
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[4, 16, 64, 256, 1024, 5000],
+                        help="number of polygon vertices")
+    parser.add_argument("--only", nargs="+", choices=sorted(CORPORA), default=sorted(CORPORA))
+    parser.add_argument("--seeds", type=int, default=1, help="polygons per kind and size")
+    parser.add_argument("--repeat", type=int, default=1, help="timed runs per polygon, best is kept")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="also time skeletonize_many on a pool of this many processes")
+    parser.add_argument("--out", default="bench_skeleton.json")
+    return parser.parse_args(argv)
+
+
+def run(args, skeleton):
+    records = []
+    for kind in args.only:
+        for n in args.sizes:
+            for seed in range(args.seeds):
+                polygon, inner = CORPORA[kind](n, random.Random(seed))
+                rec = {"kind": kind, "size": n, "seed": seed,
+                       "vertices": len(polygon) + sum(len(h) for h in inner)}
+                try:
+                    seconds, output = timed(skeleton, polygon, inner, args.repeat)
+                    rec.update(seconds=seconds, subtrees=len(output), violations=check(polygon, inner, output))
+                except Exception as e:
+                    rec["error"] = repr(e)
+                records.append(rec)
+                print("{kind:>7} {vertices:>6} {0}".format(
+                    "{:.4f}s {}".format(rec["seconds"], rec["violations"]) if "seconds" in rec else rec["error"],
+                    **rec))
+    return records
+
+
+def batch(args, skeleton):
+    """skeletonize_many over each corpus against a loop in this process, both through a SkeletonCache"""
+    result = {}
+    for kind in args.only:
+        polygons = [CORPORA[kind](n, random.Random(seed)) for n in args.sizes for seed in range(args.seeds)]
+        start = time.perf_counter()
+        cache = skeleton.SkeletonCache()
+        serial = [cache.skeletonize(polygon, inner) for polygon, inner in polygons]
+        serial_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        pooled = list(skeleton.skeletonize_many(polygons, workers=args.workers))
+        pool_seconds = time.perf_counter() - start
+        same = all([(a.source, a.height, a.sinks) for a in x] == [(a.source, a.height, a.sinks) for a in y]
+                   for x, y in zip(serial, pooled)) and len(serial) == len(pooled)
+        result[kind] = {"polygons": len(polygons), "serial": serial_seconds, "pool": pool_seconds, "same": same}
+        print("{:>7} {} polygons: {:.3f}s serial, {:.3f}s on {} workers, {}".format(
+            kind, len(polygons), serial_seconds, pool_seconds, args.workers, "same output" if same else "OUTPUT DIFFERS"))
+    return result
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+    skeleton = load_skeleton()
+    records = run(args, skeleton)
+
+    scaling = {kind: growth([r for r in records if r["kind"] == kind]) for kind in args.only}
+    for kind, k in sorted(scaling.items()):
+        print("{:>7} seconds ~ n^{}".format(kind, "?" if k is None else "{:.2f}".format(k)))
+    pool = batch(args, skeleton) if args.workers else None
+    offsets = check_offsets(skeleton)
+
+    with open(args.out, "w") as fp:
+        json.dump({
+            "python": platform.python_version(),
+            "scaling": scaling,
+            "pool": pool,
+            "offsets": offsets,
+            "records": records,
+        }, fp, indent=2)
+    print("wrote {} records to {}".format(len(records), args.out))
+    if any(offsets.values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,7 @@ import bmesh
 from .balcony_types import make_balcony
 from ...utils import (
     get_edit_mesh,
+    track_changes,
     kwargs_from_props
     )
 
@@ -22,7 +23,8 @@ class Balcony:
         faces = [face for face in bm.faces if face.select]
 
         if cls.validate(faces):
-            make_balcony(bm, faces, **kwargs_from_props(props))
+            with track_changes(bm, faces):
+                make_balcony(bm, faces, **kwargs_from_props(props))
             bmesh.update_edit_mesh(me, True)
             return {'FINISHED'}
         return {'CANCELLED'}
@@ -3,6 +3,7 @@ import bmesh
 from .door_types import make_door
 from ...utils import (
     get_edit_mesh,
+    track_changes,
     kwargs_from_props,
     )
 
@@ -21,7 +22,8 @@ class Door:
         faces = [face for face in bm.faces if face.select]
 
         if cls.validate(faces):
-            make_door(bm, faces, **kwargs_from_props(props))
+            with track_changes(bm, faces):
+                make_door(bm, faces, **kwargs_from_props(props))
             bmesh.update_edit_mesh(me, True)
             return {'FINISHED'}
         return {'CANCELLED'}
@@ -6,12 +6,15 @@ from ...utils import (
     split,
     split_quad,
     filter_geom,
+    touch_verts,
     get_edit_mesh,
+    recalc_normals,
     face_with_verts,
     calc_edge_median,
     calc_face_dimensions,
     filter_vertical_edges,
-    filter_horizontal_edges
+    filter_horizontal_edges,
+    Logger
     )
 
 from ..fill import (
@@ -20,6 +23,8 @@ from ..fill import (
     fill_louver,
     )
 
+logger = Logger(__name__)
+
 def make_door(bm, faces, **kwargs):
     """Create basic flush door
 
@@ -28,7 +33,8 @@ def make_door(bm, faces, **kwargs):
     """
 
     for face in faces:
-        face = make_door_split(bm, face, **kwargs)
+        with logger.stage('split', bm):
+            face = make_door_split(bm, face, **kwargs)
         # -- check that split was successful
         if not face:
             continue
@@ -36,7 +42,8 @@ def make_door(bm, faces, **kwargs):
         nfaces = make_door_double(bm, face, **kwargs)
         for face in nfaces:
             face = make_door_frame(bm, face, **kwargs)
-            make_door_fill(bm, face, **kwargs)
+            with logger.stage('fill', bm):
+                make_door_fill(bm, face, **kwargs)
 
 def make_door_split(bm, face, size, off, **kwargs):
     """Use properties from SplitOffset to subdivide face into regular quads
@@ -75,48 +82,53 @@ def make_door_frame(bm, face, ft, fd, **kwargs):
         bmesh.ops.delete(bm, geom=[hidden], context=5)
 
     # Frame outset
-    face = bmesh.ops.extrude_discrete_faces(bm,
-            faces=[face]).get('faces')[-1]
-    bmesh.ops.translate(bm, verts=face.verts, vec=face.normal * fd)
-    delete_hidden_face(face)
+    with logger.stage('frame_extrude', bm):
+        face = bmesh.ops.extrude_discrete_faces(bm,
+                faces=[face]).get('faces')[-1]
+        bmesh.ops.translate(bm, verts=face.verts, vec=face.normal * fd)
+        touch_verts(bm, face.verts)
+        delete_hidden_face(face)
 
     # Make frame inset - frame thickness
     median = face.calc_center_median()
     if ft:
-        # Vertical Splits
-        w, _  = calc_face_dimensions(face)
-        res   = split_quad(bm, face, True, 2)
-        edges = filter_geom(res['geom_inner'], BMEdge)
-        edges.sort(key=lambda e: getattr(calc_edge_median(e),
-                    'x' if face.normal.y else 'y'))
-
-        offsets = [(w/3), (w/3)]
-        for off, e in zip(offsets, edges):
-            tvec = calc_edge_median(e) - median
-            bmesh.ops.translate(bm,
-                verts=e.verts,
-                vec=tvec.normalized() * (off-ft))
-
-        # Top horizontal split
-        face = face_with_verts(bm, list({v for e in edges for v in e.verts}))
-        v_edges = filter_vertical_edges(face.edges, face.normal)
-        new_verts = []
-        for e in v_edges:
-            vert = max(list(e.verts), key=lambda v: v.co.z)
-            _, v = bmesh.utils.edge_split(e, vert, ft / e.calc_length())
-            new_verts.append(v)
-
-        res = bmesh.ops.connect_verts(bm, verts=new_verts).get('edges')
-        face = min(list({f for e in res for f in e.link_faces}),
-                key=lambda f: f.calc_center_median().z)
+        with logger.stage('inset', bm):
+            # Vertical Splits
+            w, _  = calc_face_dimensions(face)
+            res   = split_quad(bm, face, True, 2)
+            edges = filter_geom(res['geom_inner'], BMEdge)
+            edges.sort(key=lambda e: getattr(calc_edge_median(e),
+                        'x' if face.normal.y else 'y'))
+
+            offsets = [(w/3), (w/3)]
+            for off, e in zip(offsets, edges):
+                tvec = calc_edge_median(e) - median
+                bmesh.ops.translate(bm,
+                    verts=e.verts,
+                    vec=tvec.normalized() * (off-ft))
+
+            # Top horizontal split
+            face = face_with_verts(bm, list({v for e in edges for v in e.verts}))
+            v_edges = filter_vertical_edges(face.edges, face.normal)
+            new_verts = []
+            for e in v_edges:
+                vert = max(list(e.verts), key=lambda v: v.co.z)
+                _, v = bmesh.utils.edge_split(e, vert, ft / e.calc_length())
+                new_verts.append(v)
+
+            res = bmesh.ops.connect_verts(bm, verts=new_verts).get('edges')
+            touch_verts(bm, new_verts)
+            face = min(list({f for e in res for f in e.link_faces}),
+                    key=lambda f: f.calc_center_median().z)
 
     # # Make frame extrude - frame depth
-    bmesh.ops.recalc_face_normals(bm, faces=list(bm.faces))
+    recalc_normals(bm)
     if fd:
-        f = bmesh.ops.extrude_discrete_faces(bm,
-                faces=[face]).get('faces')[-1]
-        bmesh.ops.translate(bm, verts=f.verts, vec=-f.normal * fd)
-        delete_hidden_face(f)
+        with logger.stage('frame_depth', bm):
+            f = bmesh.ops.extrude_discrete_faces(bm,
+                    faces=[face]).get('faces')[-1]
+            bmesh.ops.translate(bm, verts=f.verts, vec=-f.normal * fd)
+            delete_hidden_face(f)
         return f
     return face
 
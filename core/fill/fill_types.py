@@ -2,6 +2,9 @@ import bmesh
 from mathutils import Vector, Matrix
 from bmesh.types import BMEdge, BMVert
 from ...utils import (
+    weld_verts,
+    touch_verts,
+    recalc_normals,
     filter_geom,
     filter_vertical_edges,
     filter_horizontal_edges,
@@ -49,13 +52,11 @@ def fill_panel(bm, face, panel_x, panel_y, panel_b, panel_t, panel_d, **kwargs):
                             {f for v in vts for f in v.link_faces if f.normal == n})
                      )
         bmesh.ops.inset_individual(bm, faces=faces, thickness=panel_t / 2)
-        bmesh.ops.translate(
-            bm,
-            verts=list({v for f in faces for v in f.verts}),
-            vec=n*panel_d
-        )
-        # recalc_face_normals()-->计算面的“外部”法线
-        bmesh.ops.recalc_face_normals(bm, faces=list(bm.faces))
+        panel_verts = list({v for f in faces for v in f.verts})
+        bmesh.ops.translate(bm, verts=panel_verts, vec=n*panel_d)
+        touch_verts(bm, panel_verts)
+        # 只对改动过的区域重新计算面的“外部”法线
+        recalc_normals(bm)
 
 
 def fill_glass_panes(bm, face, panel_x, panel_y, panel_t, panel_d, **kwargs):
@@ -165,6 +166,7 @@ def fill_louver(bm, face, louver_m, louver_count, louver_d, louver_b, **kwargs):
         edges=filter_vertical_edges(face.edges, face.normal),
         cuts=count
     )
+    touch_verts(bm, filter_geom(res['geom_inner'], BMVert))
 
     # 需要添加百叶窗的面
     faces = list({f for e in filter_geom(res['geom_inner'], BMEdge) for f in e.link_faces})
@@ -181,6 +183,7 @@ def fill_louver(bm, face, louver_m, louver_count, louver_d, louver_b, **kwargs):
         )
     # 挤压百叶窗面
     res = bmesh.ops.extrude_discrete_faces(bm, faces=louver_faces)
+    touch_verts(bm, {v for face in res['faces'] for v in face.verts})
     bmesh.ops.translate(
         bm,
         vec=normal * louver_d,
@@ -195,4 +198,4 @@ def fill_louver(bm, face, louver_m, louver_count, louver_d, louver_b, **kwargs):
         bmesh.ops.translate(bm, vec=-face.normal*louver_d, verts=top_edge.verts)
 
     # clearup
-    bmesh.ops.remove_doubles(bm, verts=bm.verts, dist=0.01)
+    weld_verts(bm, dist=0.01)
@@ -2,6 +2,7 @@ import bmesh
 from .floor_types import make_floors
 from ...utils import (
     get_edit_mesh,
+    track_changes,
     kwargs_from_props
 )
 
@@ -15,10 +16,9 @@ class Floor:
         bm = bmesh.from_edit_mesh(me)
 
         if cls.validate(bm):
-            if any([f for f in bm.faces if f.select]):
-                make_floors(bm, None, **kwargs_from_props(props))
-            else:
-                edges = [e for e in bm.edges if e.is_boundry]
+            faces = [f for f in bm.faces if f.select]
+            edges = None if faces else [e for e in bm.edges if e.is_boundry]
+            with track_changes(bm, faces or edges):
                 make_floors(bm, edges, **kwargs_from_props(props))
             bmesh.update_edit_mesh(me, True)
             return {'FINISHED'}
@@ -4,9 +4,11 @@ from bmesh.types import (
     BMVert, BMFace, BMEdge
 )
 from ...utils import (
-    select, filter_geom
+    select, filter_geom, touch_verts, touch_faces, recalc_normals, Logger
 )
 
+logger = Logger(__name__)
+
 
 def make_floors(bm, edges, floor_count, floor_height,
                 slab_thickness, slab_outset, **kwargs):
@@ -37,18 +39,22 @@ def make_floors(bm, edges, floor_count, floor_height,
     for offset in it.islice(offsets, 0, floor_count*2):
         if offset == 0 and offset == slab_thickness:
             continue
-        ext = bmesh.ops.extrude_edge_only(bm, edges=edges)
-        # ???translate
-        bmesh.ops.translate(bm, vec=(0, 0, offset), verts=filter_geom(ext['geom'], BMVert))
+        with logger.stage('extrude', bm, edges=len(edges)):
+            ext = bmesh.ops.extrude_edge_only(bm, edges=edges)
+            # ???translate
+            bmesh.ops.translate(bm, vec=(0, 0, offset), verts=filter_geom(ext['geom'], BMVert))
+            touch_verts(bm, filter_geom(ext['geom'], BMVert))
         edges = filter_geom(ext['geom'], BMEdge)
         if offset == slab_thickness:
             slab_faces.extend(filter_geom(ext['geom'], BMFace))
     # --将面嵌入区域
-    bmesh.ops.inset_region(bm, faces=slab_faces, depth=-slab_outset)
+    with logger.stage('slab_inset', bm, faces=len(slab_faces)):
+        bmesh.ops.inset_region(bm, faces=slab_faces, depth=-slab_outset)
     # --上下文创建，从顶点创建新面，从边网生成东西，制作线边等
-    bmesh.ops.contextual_create(bm, geom=edges)
-    # --计算指定输入面的“外部”法线
-    bmesh.ops.recalc_face_normals(bm, faces=bm.faces)
+    ret = bmesh.ops.contextual_create(bm, geom=edges)
+    touch_faces(bm, ret['faces'])
+    # --计算改动区域内面的“外部”法线
+    recalc_normals(bm)
 
     if del_faces:
         bmesh.ops.delete(bm, geom=del_faces, context=5)     # ???context
@@ -1,5 +1,6 @@
 import bpy
 
+from ...utils import unshare_edit_mesh
 from .floorplan import Floorplan
 from .floorplan_ops import FloorplanOperator
 from .floorplan_props import FloorplanProperty
@@ -14,8 +15,12 @@ classes = (
 def register_floorplan():
     for cls in classes:
         bpy.utils.register_class(cls)
+    # 共用网格的物体进入编辑模式时让它独占网格(copy-on-write)
+    bpy.app.handlers.scene_update_post.append(unshare_edit_mesh)
 
 
 def unregister_floorplan():
     for cls in classes:
         bpy.utils.unregister_class(cls)
+    if unshare_edit_mesh in bpy.app.handlers.scene_update_post:
+        bpy.app.handlers.scene_update_post.remove(unshare_edit_mesh)
@@ -1,5 +1,8 @@
 import bpy
 import bmesh
+import inspect
+import hashlib
+from mathutils import Matrix, Vector
 from .floorplan_types import (
     fp_rectangular,
     fp_circular,
@@ -9,42 +12,162 @@ from .floorplan_types import (
 )
 from ...utils import (
     link_obj,
+    link_objs,
     make_mesh,
+    SHARED_MESH_TAG,
+    bm_append,
     bm_to_obj,
     make_object,
-    bm_from_obj,
     kwargs_from_props
 )
 
 
+# 布局形状(fp_type)对应的生成函数
+FP_BUILDERS = {
+    'RECTANGULAR': fp_rectangular,
+    'CIRCULAR': fp_circular,
+    'COMPOSITE': fp_composite,
+    'H-SHAPED': fp_hshaped,
+    'RANDOM': fp_random,
+}
+
+
+# 内容键 -> (共用网格的名称, 网格指纹)
+_mesh_cache = {}
+
+
+def floorplan_key(kwargs):
+    """由布局形状及其生成函数用到的参数计算内容键"""
+    fp_type = kwargs.get('type')
+    builder = FP_BUILDERS.get(fp_type)
+    names = [name for name, p in inspect.signature(builder).parameters.items()
+             if name != 'bm' and p.kind != p.VAR_KEYWORD] if builder else []
+    text = repr((fp_type, [(name, kwargs.get(name)) for name in names]))
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def _mesh_fingerprint(me):
+    """网格的面数和顶点坐标摘要, 用来发现在编辑模式中被直接修改过的共用网格"""
+    co = [0.0] * (len(me.vertices) * 3)
+    me.vertices.foreach_get('co', co)
+    return len(me.polygons), hash(tuple(round(c, 5) for c in co))
+
+
+def cached_floorplan_mesh(key):
+    """内容键对应的共用网格, 网格已删除/被改名/正在编辑/已被修改时返回None"""
+    name, fingerprint = _mesh_cache.get(key, ('', None))
+    me = bpy.data.meshes.get(name)
+    if me is None or me.get(SHARED_MESH_TAG) != key or me.is_editmode or _mesh_fingerprint(me) != fingerprint:
+        _mesh_cache.pop(key, None)
+        return None
+    return me
+
+
+def clear_floorplan_cache():
+    _mesh_cache.clear()
+
+
+def lot_matrix(lot):
+    """
+    地块的变换矩阵: 直接给出matrix, 或由location与rotation(绕z轴, 弧度)组合
+    """
+    if lot.get('matrix') is not None:
+        return Matrix(lot['matrix'])
+    loc = Matrix.Translation(Vector(lot.get('location', (0, 0, 0))))
+    rot = Matrix.Rotation(lot.get('rotation', 0.0), 4, 'Z')
+    return loc * rot
+
+
 class Floorplan:
 
     @classmethod
-    def build(cls, context, props):
+    def build(cls, context, props, shared=True):
         """
         利用预先设置好的布局形状(fp_type)和属性(props)来生成几何
         Args:
             context:(bpy.context)blender context
             props:(bpy.types.PropertyGroup)FloorplanProperty
+            shared:(bool)属性相同的平面布局共用同一个网格, 进入编辑模式时再复制(见unshare_edit_mesh)
         """
-        # 新建物体
-        obj = make_object('floorplan', make_mesh('fp_mesh'))
-        # 由物体数据创建多边形网格
-        bm = bm_from_obj(obj)
         # ???
         kwargs = kwargs_from_props(props)
-        if props.type == 'RECTANGULAR':
-            fp_rectangular(bm, **kwargs)
-        elif props.type == 'CIRCULAR':
-            fp_circular(bm, **kwargs)
-        elif props.type == 'COMPOSITE':
-            fp_composite(bm, **kwargs)
-        elif props.type == 'H-SHAPED':
-            fp_hshaped(bm, **kwargs)
-        elif props.type == 'RANDOM':
-            fp_random(bm, **kwargs)
-
-        # 将多边形网格赋予物体
-        bm_to_obj(bm, obj)
+        # 新建物体
+        obj = make_object('floorplan', cls._mesh(kwargs, shared))
         # 将物体链接到场景
         link_obj(obj)
+        return obj
+
+    @classmethod
+    def build_many(cls, context, props, lots, merge=True, shared=True):
+        """
+        一次生成多个地块的平面布局
+        Args:
+            context:(bpy.context)blender context
+            props:(bpy.types.PropertyGroup)FloorplanProperty, 地块未给出的属性取此处的值
+            lots:(list of dict)地块描述, 如 {'type': 'RANDOM', 'seed': 3, 'width': 4, 'location': (10, 0, 0)},
+                 可包含FloorplanProperty的任意属性, 以及变换matrix或location/rotation
+            merge:(bool)True时所有地块合并为一个物体, 整批只写入一次网格;
+                  False时每个地块一个物体, 最后一次性链接到场景
+            shared:(bool)merge为False时, 相同的地块共用同一个网格
+        Returns:
+            (list)新建的物体
+        """
+        defaults = kwargs_from_props(props)
+        origin = Matrix.Translation(context.scene.cursor_location)
+
+        if merge:
+            obj = make_object('floorplan', make_mesh('fp_mesh'))
+            bm = bmesh.new()
+            for lot in lots:
+                # 各形状函数假定网格中只有自己的几何, 先在临时网格中生成再复制过来
+                tmp = cls._build_bm(cls._lot_kwargs(defaults, lot))
+                bm_append(bm, tmp, lot_matrix(lot))
+                tmp.free()
+            bm_to_obj(bm, obj)
+            objs = [obj]
+            obj.location = context.scene.cursor_location
+        else:
+            objs = []
+            for lot in lots:
+                obj = make_object('floorplan', cls._mesh(cls._lot_kwargs(defaults, lot), shared))
+                obj.matrix_world = origin * lot_matrix(lot)
+                objs.append(obj)
+
+        link_objs(objs)
+        return objs
+
+    @classmethod
+    def _mesh(cls, kwargs, shared):
+        """平面布局的网格, shared时先在缓存中按内容键查找"""
+        if not shared:
+            return cls._new_mesh(kwargs)
+        key = floorplan_key(kwargs)
+        me = cached_floorplan_mesh(key)
+        if me is None:
+            me = cls._new_mesh(kwargs)
+            me[SHARED_MESH_TAG] = key
+            _mesh_cache[key] = (me.name, _mesh_fingerprint(me))
+        return me
+
+    @classmethod
+    def _new_mesh(cls, kwargs):
+        me = make_mesh('fp_mesh')
+        bm = cls._build_bm(kwargs)
+        bm.to_mesh(me)
+        bm.free()
+        return me
+
+    @staticmethod
+    def _lot_kwargs(defaults, lot):
+        kwargs = dict(defaults)
+        kwargs.update((k, v) for k, v in lot.items() if k not in ('matrix', 'location', 'rotation'))
+        return kwargs
+
+    @staticmethod
+    def _build_bm(kwargs):
+        """在新的bmesh中生成一个平面布局"""
+        bm = bmesh.new()
+        builder = FP_BUILDERS.get(kwargs.get('type'))
+        if builder:
+            builder(bm, **kwargs)
+        return bm
@@ -59,6 +59,20 @@ class FloorplanProperty(bpy.types.PropertyGroup):
         description="Number of segments in the circle"
     )
 
+    adaptive_segs = BoolProperty(
+        name="Adaptive Segments",
+        default=False,
+        description="Choose the number of segments from the radius and the chord error"
+    )
+
+    chord_error = FloatProperty(
+        name="Chord Error",
+        min=0.0001,
+        max=10.0,
+        default=0.01,
+        description="Largest distance between the circle and its segments"
+    )
+
     tw1 = FloatProperty(
         name="Tail Width",
         min=0.0,
@@ -147,9 +161,13 @@ class FloorplanProperty(bpy.types.PropertyGroup):
         elif self.type == 'CIRCULAR':
             col = box.column(align=True)
             col.prop(self, 'radius')
-            col.prop(self, 'segs')
+            if self.adaptive_segs:
+                col.prop(self, 'chord_error')
+            else:
+                col.prop(self, 'segs')
 
-            row = box.row()
+            row = box.row(align=True)
+            row.prop(self, 'adaptive_segs', toggle=True)
             row.prop(self, 'cap_tris', toggle=True)
 
         elif self.type == 'COMPOSITE':
@@ -0,0 +1,21 @@
+import bpy
+
+from .footprints import Footprints
+from .footprints_ops import FootprintImportOperator
+from .footprints_props import FootprintProperty
+
+
+classes = (
+    FootprintProperty,
+    FootprintImportOperator
+)
+
+
+def register_footprints():
+    for cls in classes:
+        bpy.utils.register_class(cls)
+
+
+def unregister_footprints():
+    for cls in classes:
+        bpy.utils.unregister_class(cls)
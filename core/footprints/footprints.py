@@ -0,0 +1,56 @@
+import bmesh
+import itertools as it
+from .footprints_types import iter_footprints, add_footprint
+from ...utils import (
+    link_objs,
+    make_mesh,
+    make_object,
+    kwargs_from_props
+)
+
+
+class Footprints:
+
+    @classmethod
+    def build(cls, context, props, filepath, report=None):
+        """
+        从GeoJSON/CSV流式导入建筑轮廓并生成楼层
+        每chunk_size栋建筑写入一个合并的网格物体, 不会一次读入整个文件
+        Args:
+            context:(bpy.context)blender context
+            props:(bpy.types.PropertyGroup)FootprintProperty
+            filepath:(str)文件路径
+            report:(FootprintReport)累计轮廓检查的计数(通过/修复/拒绝)
+        Returns:
+            (list)新建的物体
+        """
+        kwargs = kwargs_from_props(props)
+        footprints = iter_footprints(filepath, report=report, **kwargs)
+
+        first = next(footprints, None)
+        if first is None:
+            return []
+        # 坐标相对第一个点, 避免大坐标在网格(单精度)中丢失精度
+        origin = first[0][0]
+        footprints = it.chain([first], footprints)
+
+        objs = []
+        chunk_size = max(1, kwargs.get('chunk_size', 1))
+        while True:
+            chunk = list(it.islice(footprints, chunk_size))
+            if not chunk:
+                break
+            bm = bmesh.new()
+            for ring, floor_count, floor_height in chunk:
+                add_footprint(bm, ring, origin, **dict(kwargs, floor_count=floor_count, floor_height=floor_height))
+
+            obj = make_object('footprints', make_mesh('footprints_mesh'))
+            bm.to_mesh(obj.data)
+            bm.free()
+            obj.location = context.scene.cursor_location
+            obj['footprint_origin'] = origin
+            obj['footprint_count'] = len(chunk)
+            objs.append(obj)
+
+        link_objs(objs)
+        return objs
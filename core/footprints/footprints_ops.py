@@ -0,0 +1,35 @@
+import bpy
+from bpy_extras.io_utils import ImportHelper
+from ...utils import FootprintReport
+from .footprints import Footprints
+from .footprints_props import FootprintProperty
+
+
+class FootprintImportOperator(bpy.types.Operator, ImportHelper):
+    """从GeoJSON/CSV文件导入建筑轮廓并生成楼层"""
+    bl_idname = "cynthia.import_footprints"
+    bl_label = "Import Footprints"
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filter_glob = bpy.props.StringProperty(
+        default="*.geojson;*.json;*.geojsonl;*.ndjson;*.csv",
+        options={'HIDDEN'}
+    )
+
+    props = bpy.props.PointerProperty(type=FootprintProperty)
+
+    @classmethod
+    def poll(cls, context):
+        return context.mode == 'OBJECT'
+
+    def execute(self, context):
+        report = FootprintReport()
+        objs = Footprints.build(context, self.props, self.filepath, report)
+        self.report({'INFO'}, "Footprints: " + report.summary())
+        if not objs:
+            self.report({'WARNING'}, "No polygon footprints in {}".format(self.filepath))
+            return {'CANCELLED'}
+        return {'FINISHED'}
+
+    def draw(self, context):
+        self.props.draw(context, self.layout)
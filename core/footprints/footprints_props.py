@@ -0,0 +1,24 @@
+import bpy
+from bpy.props import *
+from ..floor.floor_props import FloorProperty
+
+
+class FootprintProperty(bpy.types.PropertyGroup):
+    """导入建筑轮廓的属性, 要素未给出楼层数/层高时使用floor中的值"""
+
+    chunk_size = IntProperty(
+        name="Buildings per Mesh",
+        min=1,
+        max=1000000,
+        default=2000,
+        description="Number of buildings merged into each mesh"
+    )
+
+    floor = PointerProperty(type=FloorProperty)
+
+    def draw(self, context, layout):
+        """操作面板布局"""
+        col = layout.column(align=True)
+        col.prop(self, "chunk_size")
+
+        self.floor.draw(context, layout)
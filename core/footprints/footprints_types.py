@@ -0,0 +1,212 @@
+import re
+import csv
+import sys
+import json
+import itertools as it
+from ..floor.floor_types import make_floors
+from ...utils import track_changes, validate_rings
+
+# 流式读取建筑轮廓(GeoJSON/CSV), 每次只在内存中保留一个要素
+
+_WS = ' \t\r\n\x1e,'     # 空白、逗号以及GeoJSON文本序列的记录分隔符
+_CLOSING = {'{': '}', '[': ']', '"': '"'}     # 各类值最后一个字符
+
+
+class _JSONStream:
+    """按块读取文本, 逐个解码JSON值"""
+
+    def __init__(self, fp, size=1 << 16):
+        self.fp = fp
+        self.size = size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _read(self):
+        """读入一块, 返回读到的文本(文件结束时为'')"""
+        text = self.fp.read(self.size)
+        if not text:
+            self.eof = True
+            return ''
+        self.buf = self.buf[self.pos:] + text
+        self.pos = 0
+        return text
+
+    def _read_past(self, stops):
+        """读入新块, 直到读到stops中的某个字符; 文件结束时返回False"""
+        while True:
+            text = self._read()
+            if not text:
+                return False
+            if any(c in text for c in stops):
+                return True
+
+    def peek(self, skip=_WS):
+        """跳过分隔字符, 返回下一个字符(结束时返回'')"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in skip:
+                self.pos += 1
+            if self.pos < len(self.buf) or not self._read():
+                return self.buf[self.pos:self.pos + 1]
+
+    def take(self, char):
+        if self.peek(' \t\r\n') != char:
+            raise ValueError("Expected {!r} at offset {}".format(char, self.pos))
+        self.pos += 1
+
+    def value(self):
+        """
+        解码下一个完整的JSON值, 值可能跨越多个块
+        解码失败后只在读到能结束这个值的字符(对象为'}', 数组为']')之后才重新解码,
+        大的值不会在每读一块时都从头解码一次
+        """
+        stops = _CLOSING.get(self.peek(), _WS + ']}')
+        while True:
+            try:
+                val, end = self.decoder.raw_decode(self.buf, self.pos)
+            except ValueError:
+                if self.eof or not self._read_past(stops):
+                    raise
+                continue
+            # 数字可能在块的末尾被截断
+            if end == len(self.buf) and not self.eof and self._read():
+                continue
+            self.pos = end
+            return val
+
+    def array(self):
+        """逐个返回数组中的元素"""
+        self.take('[')
+        while self.peek() not in (']', ''):
+            yield self.value()
+        self.pos += 1
+
+
+def iter_geojson(fp):
+    """
+    逐个返回GeoJSON中的Feature, 支持FeatureCollection(流式读取其features数组)、
+    Feature数组以及逐行/RS分隔的Feature序列
+    """
+    stream = _JSONStream(fp)
+    while True:
+        char = stream.peek()
+        if not char:
+            return
+        if char == '[':
+            for feature in stream.array():
+                yield feature
+            continue
+
+        # 顶层对象逐个成员解码, features成员流式读取
+        stream.take('{')
+        obj = {}
+        while stream.peek(' \t\r\n,') != '}':
+            key = stream.value()
+            stream.take(':')
+            if key == 'features':
+                for feature in stream.array():
+                    yield feature
+            else:
+                obj[key] = stream.value()
+        stream.pos += 1
+        if obj.get('type') == 'Feature':
+            yield obj
+
+
+# 匹配多边形的外环: POLYGON ((外环), (洞)) / MULTIPOLYGON (((外环), (洞)), ((外环)))
+_WKT_OUTER = re.compile(r'\(\s*\(\s*([^()]+)\)')
+
+
+def wkt_outer_rings(text):
+    """WKT的POLYGON/MULTIPOLYGON中各多边形的外环"""
+    return [[tuple(float(c) for c in point.split()) for point in ring.split(',')]
+            for ring in _WKT_OUTER.findall(text)]
+
+
+def geometry_outer_rings(geometry):
+    """GeoJSON几何(Polygon/MultiPolygon)中各多边形的外环"""
+    if not geometry:
+        return []
+    coords = geometry.get('coordinates') or []
+    if geometry.get('type') == 'Polygon':
+        return coords[:1]
+    if geometry.get('type') == 'MultiPolygon':
+        return [poly[0] for poly in coords if poly]
+    return []
+
+
+_CSV_GEOMETRY = ('wkt', 'WKT', 'geometry', 'geom', 'the_geom', 'WKT_GEOMETRY')
+
+
+def iter_csv(fp):
+    """逐行返回CSV中的(外环列表, 属性), 几何为WKT或GeoJSON文本"""
+    csv.field_size_limit(max(csv.field_size_limit(), min(sys.maxsize, 2 ** 31 - 1)))
+    reader = csv.DictReader(fp)
+    column = next((name for name in _CSV_GEOMETRY if name in (reader.fieldnames or [])), None)
+    if column is None:
+        raise ValueError("CSV has no geometry column, expected one of {}".format(', '.join(_CSV_GEOMETRY)))
+    for row in reader:
+        text = row.pop(column) or ''
+        if text.lstrip().startswith('{'):
+            rings = geometry_outer_rings(json.loads(text))
+        else:
+            rings = wkt_outer_rings(text)
+        yield rings, row
+
+
+def _count(val):
+    """楼层数: 接受整数、小数以及数字文本"""
+    return int(float(val))
+
+
+def _number(val, cast, default):
+    try:
+        val = cast(val)
+    except (TypeError, ValueError):
+        return default
+    return val if val > 0 else default
+
+
+def _iter_rings(filepath, floor_count, floor_height):
+    """逐个返回文件中多边形外环的(原始点列, 楼层数, 层高)"""
+    if filepath.lower().endswith(('.csv', '.txt')):
+        with open(filepath, newline='', encoding='utf-8') as fp:
+            for rings, attrs in iter_csv(fp):
+                count = _number(attrs.get('floor_count'), _count, floor_count)
+                height = _number(attrs.get('floor_height'), float, floor_height)
+                for points in rings:
+                    yield points, count, height
+    else:
+        with open(filepath, encoding='utf-8') as fp:
+            for feature in iter_geojson(fp):
+                attrs = feature.get('properties') or {}
+                count = _number(attrs.get('floor_count'), _count, floor_count)
+                height = _number(attrs.get('floor_height'), float, floor_height)
+                for points in geometry_outer_rings(feature.get('geometry')):
+                    yield points, count, height
+
+
+def iter_footprints(filepath, floor_count=1, floor_height=2.0, report=None, batch=4096, **kwargs):
+    """
+    逐个返回文件中建筑的(轮廓, 楼层数, 层高), 多部分的要素每个部分单独返回
+    楼层数和层高取要素属性floor_count/floor_height, 缺失或无效时使用给定的默认值
+    轮廓每batch个一组先经过validate_rings检查: 修复后为逆时针, 无法修复的被跳过并计入report
+    """
+    items = _iter_rings(filepath, floor_count, floor_height)
+    while True:
+        chunk = list(it.islice(items, batch))
+        if not chunk:
+            return
+        for idx, ring in validate_rings([points for points, _, _ in chunk], report):
+            yield ring, chunk[idx][1], chunk[idx][2]
+
+
+def add_footprint(bm, ring, origin, floor_count, floor_height, slab_thickness, slab_outset, **kwargs):
+    """在bm中以轮廓(相对origin)生成地面并挤出楼层, 只有这栋建筑的区域参与法线计算"""
+    ox, oy = origin
+    verts = [bm.verts.new((x - ox, y - oy, 0)) for x, y in ring]
+    face = bm.faces.new(verts)
+    with track_changes(bm, [face]):
+        make_floors(bm, list(face.edges), floor_count, floor_height, slab_thickness, slab_outset)
+    return face
@@ -4,6 +4,7 @@ import bmesh
 from .rails_types import MakeRailing
 from ...utils import (
     get_edit_mesh,
+    track_changes,
     kwargs_from_props
     )
 
@@ -15,7 +16,9 @@ class Rails:
         bm = bmesh.from_edit_mesh(me)
 
         if cls.validate(bm):
-            MakeRailing().from_selection(bm, **kwargs_from_props(props))
+            geom = [f for f in bm.faces if f.select] + [e for e in bm.edges if e.select]
+            with track_changes(bm, geom):
+                MakeRailing().from_selection(bm, **kwargs_from_props(props))
             bmesh.update_edit_mesh(me, True)
             return {'FINISHED'}
         return {'CANCELLED'}
@@ -42,6 +42,14 @@ class RailProperty(bpy.types.PropertyGroup):
         name="Has Decor", default=False,
         description="Whether corner posts have decor")
 
+    adaptive_segs = BoolProperty(
+        name="Adaptive Segments", default=False,
+        description="Choose the segments of round corner posts from their radius and the chord error")
+
+    chord_error = FloatProperty(
+        name="Chord Error", min=0.0001, max=1.0, default=0.005,
+        description="Largest distance between a round corner post and its segments")
+
     remove_colinear = BoolProperty(
         name="Remove Colinear", default=False,
         description="Whether to remove extra colinear posts")
@@ -56,6 +64,16 @@ class RailProperty(bpy.types.PropertyGroup):
         name="Fill Type", items=fill_types, default='POSTS',
         description="Type of railing")
 
+    array_modes = [
+        ("DUPLICATE", "Duplicate", "Duplicate each element with bmesh operators", 0),
+        ("BATCH", "Batch", "Build all copies in one pass from an offset array", 1),
+        ("INSTANCE", "Instance", "Place copies as dupli-face instances of one shared element", 2)
+    ]
+
+    array_mode = EnumProperty(
+        name="Array Mode", items=array_modes, default='DUPLICATE',
+        description="How repeated posts and rails are created")
+
     def draw(self, context, layout):
 
         row = layout.row()
@@ -66,47 +84,39 @@ class RailProperty(bpy.types.PropertyGroup):
             col = box.column(align=True)
             col.prop(self, 'pd')
             col.prop(self, 'ps')
+            col.prop(self, 'array_mode', text="")
 
-            box1 = box.box()
-            box1.label("Corner Posts")
-
-            col = box1.column(align=True)
-            col.prop(self, 'cpw')
-            col.prop(self, 'cph')
-
-            row = box1.row(align=True)
-            row.prop(self, 'remove_colinear', toggle=True)
-            row.prop(self, 'has_decor', toggle=True)
+            self.draw_corner_posts(box)
 
         elif self.fill == 'RAILS':
             col = box.column(align=True)
             col.prop(self, 'rd')
             col.prop(self, 'rs')
             col.prop(self, 'expand', text="Expand Rails", toggle=True)
+            col.prop(self, 'array_mode', text="")
 
-            box1 = box.box()
-            box1.label("Corner Posts")
-
-            col = box1.column(align=True)
-            col.prop(self, 'cpw')
-            col.prop(self, 'cph')
-
-            row = box1.row(align=True)
-            row.prop(self, 'remove_colinear', toggle=True)
-            row.prop(self, 'has_decor', toggle=True)
+            self.draw_corner_posts(box)
 
         elif self.fill == 'WALL':
             col = box.column(align=True)
             col.prop(self, 'ww')
             col.prop(self, 'expand', text="Expand Walls", toggle=True)
 
-            box1 = box.box()
-            box1.label("Corner Posts")
+            self.draw_corner_posts(box)
+
+    def draw_corner_posts(self, box):
+        box1 = box.box()
+        box1.label("Corner Posts")
+
+        col = box1.column(align=True)
+        col.prop(self, 'cpw')
+        col.prop(self, 'cph')
 
-            col = box1.column(align=True)
-            col.prop(self, 'cpw')
-            col.prop(self, 'cph')
+        row = box1.row(align=True)
+        row.prop(self, 'remove_colinear', toggle=True)
+        row.prop(self, 'has_decor', toggle=True)
 
-            row = box1.row(align=True)
-            row.prop(self, 'remove_colinear', toggle=True)
-            row.prop(self, 'has_decor', toggle=True)
+        row = box1.row(align=True)
+        row.prop(self, 'adaptive_segs', toggle=True)
+        if self.adaptive_segs:
+            row.prop(self, 'chord_error')
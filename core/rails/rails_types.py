@@ -1,3 +1,4 @@
+import bpy
 import math
 import bmesh
 import itertools as it
@@ -11,10 +12,14 @@ from ...utils import (
     plane,
     select,
     cylinder,
+    weld_verts,
     filter_geom,
+    touch_verts,
     face_with_verts,
     calc_edge_median,
     calc_verts_median,
+    segments_for_error,
+    mesh_from_coords,
     )
 
 
@@ -29,6 +34,9 @@ class MakeRailing:
         # -- global state {remove colinear}
         self.colinear_loops = []
 
+        # -- global state {INSTANCE array mode}
+        self.instances = []
+
     def from_selection(self, bm, **kwargs):
         """ Creates railing from user selection """
         bmcopy = bm.copy()
@@ -119,6 +127,7 @@ class MakeRailing:
 
                 rail = cube(bm, *size)
                 bmesh.ops.translate(bm, vec=pos, verts=rail['verts'])
+                touch_verts(bm, rail['verts'])
                 del_faces(bm, rail, right=True)
 
                 # --rotate
@@ -164,9 +173,13 @@ class MakeRailing:
 
         self.make_corner_post(bm, loops, **kwargs)
         self.make_fill(bm, edges, **kwargs)
-        bmesh.ops.remove_doubles(bm, verts=bm.verts)
+        weld_verts(bm)
+
+        if self.instances:
+            instance_elements(bpy.context.edit_object, self.instances)
+            self.instances = []
 
-    def make_corner_post(self, bm, loops, cpw, cph, has_decor, **kwargs):
+    def make_corner_post(self, bm, loops, cpw, cph, has_decor, adaptive_segs=False, chord_error=0.005, **kwargs):
         """ Create Corner posts """
         num_poly = lambda ang: round((2*math.pi) / (math.pi - ang))
         for loop in loops:
@@ -189,13 +202,24 @@ class MakeRailing:
 
             else:
                 pos = v.co + (vec * cpw) + Vector((0, 0, cph/2))
-                post = create_cylinder(bm, cpw/2, cph, segments, pos)
 
                 # -- store global state
                 self.wall_switch = True
                 self.num_corners = segments
                 self.corner_angle = math.pi - angle
 
+                if adaptive_segs:
+                    # -- walls end on the post where they meet its circle, keep a vertex at each of those
+                    #    two points and split the arcs between them by the chord error alone
+                    off = math.sqrt(2 * (cpw**2) * (1 - math.cos(self.corner_angle)))
+                    ends = [v.co + (other.co - v.co).normalized() * off
+                            for other in (loop.link_loop_next.vert, loop.link_loop_prev.vert)]
+                    # -- create_circle in this blender takes its diameter as the radius, the post radius is cpw
+                    post = create_post(bm, cpw, cph, pos, ends, segments_for_error(cpw, chord_error))
+                    self.num_corners = len(post['verts']) // 2
+                    continue
+                post = create_cylinder(bm, cpw/2, cph, segments, pos)
+
             # -- align
             v1, v2 = e.verts
             dx, dy = (v1.co - v2.co).normalized().xy
@@ -213,7 +237,7 @@ class MakeRailing:
             elif fill == 'WALL':
                 self.make_fill_walls(bm, edge, **kwargs)
 
-    def make_fill_rails(self, bm, edge, cpw, cph, rd, rs, expand, **kwargs):
+    def make_fill_rails(self, bm, edge, cpw, cph, rd, rs, expand, array_mode='DUPLICATE', **kwargs):
         v1, v2 = edge.verts
         dx, dy = (v1.co - v2.co).normalized().xy
         tan = edge_tangent(edge)
@@ -227,16 +251,20 @@ class MakeRailing:
             size = (edge.calc_length() - (cpw * 2), rs, rs)
 
         rail = cube(bm, *size)
+        touch_verts(bm, rail['verts'])
         del_faces(bm, rail, left=True, right=True)
 
+        angle = math.atan2(dy, dx)
         bmesh.ops.rotate(bm, verts=rail['verts'],
             cent=calc_verts_median(rail['verts']),
-            matrix=Matrix.Rotation(math.atan2(dy, dx), 4, 'Z'))
+            matrix=Matrix.Rotation(angle, 4, 'Z'))
 
         rail_count = int((cph / rs) * rd)
-        array_elements(bm, rail, rail_count, start, stop)
+        offsets = array_elements(bm, rail, rail_count, start, stop, array_mode)
+        if offsets:
+            self.instances.append(element_data(rail, angle) + (angle, offsets))
 
-    def make_fill_posts(self, bm, edge, cpw, cph, pd, ps, rs, **kwargs):
+    def make_fill_posts(self, bm, edge, cpw, cph, pd, ps, rs, array_mode='DUPLICATE', **kwargs):
         v1, v2 = edge.verts
         vec = (v1.co - v2.co).normalized()
         tan = edge_tangent(edge).normalized()
@@ -249,14 +277,18 @@ class MakeRailing:
         size = (ps, ps, cph-rs)
 
         post = cube(bm, *size)
+        touch_verts(bm, post['verts'])
         del_faces(bm, post, top=True, bottom=True)
 
+        angle = math.atan2(*vec.yx)
         bmesh.ops.rotate(bm, verts=post['verts'],
             cent=calc_verts_median(post['verts']),
-            matrix=Matrix.Rotation(math.atan2(*vec.yx), 4, 'Z'))
+            matrix=Matrix.Rotation(angle, 4, 'Z'))
 
         post_count = int((edge.calc_length() / ps) * pd)
-        array_elements(bm, post, post_count, start, stop)
+        offsets = array_elements(bm, post, post_count, start, stop, array_mode)
+        if offsets:
+            self.instances.append(element_data(post, angle) + (angle, offsets))
 
         # fill gaps created by remove colinear
         if self.colinear_loops:
@@ -319,14 +351,35 @@ def create_cube(bm, size, position):
     """ Create cube with size and at position"""
     post = cube(bm, *size)
     bmesh.ops.translate(bm, verts=post['verts'], vec=position)
+    touch_verts(bm, post['verts'])
     return post
 
 def create_cylinder(bm, r, h, segs, position):
     """ Create cylinder at pos"""
     cy = cylinder(bm, r, h, segs)
     bmesh.ops.translate(bm, verts=cy['verts'], vec=position)
+    touch_verts(bm, cy['verts'])
     return cy
 
+def create_post(bm, r, h, position, ends, segs):
+    """ Create cylinder at pos with a vertex at each of the ends, no arc longer than a 1/segs turn """
+    cx, cy, cz = position
+    first, second = [math.atan2(p.y - cy, p.x - cx) for p in ends]
+    span = (second - first) % (2 * math.pi)
+    angles = []
+    for start, arc in ((first, span), (second, 2 * math.pi - span)):
+        count = max(1, int(math.ceil(arc * segs / (2 * math.pi) - 1e-9)))
+        angles.extend(start + arc * i / count for i in range(count))
+
+    ring = [(cx + r * math.cos(a), cy + r * math.sin(a)) for a in angles]
+    n = len(ring)
+    coords = [(x, y, cz - h/2) for x, y in ring] + [(x, y, cz + h/2) for x, y in ring]
+    faces = [list(range(n))[::-1], list(range(n, 2 * n))]
+    faces.extend([i, (i + 1) % n, n + (i + 1) % n, n + i] for i in range(n))
+    post = mesh_from_coords(bm, coords, faces)
+    touch_verts(bm, post['verts'])
+    return post
+
 def create_wall(bm, start, end, height, width, tangent):
     """ Extrude a wall of height from start to end """
     start_v1 = bm.verts.new(start)
@@ -337,6 +390,7 @@ def create_wall(bm, start, end, height, width, tangent):
     bmesh.ops.translate(bm,
         vec=end-start,
         verts=filter_geom(res['geom'], BMVert))
+    touch_verts(bm, [start_v1, start_v2] + filter_geom(res['geom'], BMVert))
 
     if width:
         face = filter_geom(res['geom'], BMFace)[-1]
@@ -348,6 +402,7 @@ def create_wall(bm, start, end, height, width, tangent):
         bmesh.ops.translate(bm,
             vec=-n*width,
             verts=filter_geom(res['geom'], BMVert))
+        touch_verts(bm, filter_geom(res['geom'], BMVert))
 
         # delete hidden geom
         edges = filter_geom(res['geom'], BMEdge)
@@ -370,17 +425,120 @@ def del_faces(bm, post, top=False, bottom=False, left=False, right=False, front=
 
     bmesh.ops.delete(bm, geom=faces, context=3)
 
-def array_elements(bm, elem, count, start, stop):
-    """ Duplicate elements count-1 times between start and stop """
+def array_elements(bm, elem, count, start, stop, mode='DUPLICATE'):
+    """ Duplicate elements count-1 times between start and stop
+
+    Args:
+        mode (str): 'DUPLICATE' copies with bmesh.ops.duplicate, 'BATCH' builds all
+            copies in one pass, 'INSTANCE' leaves the copies to instance_elements
+
+    Returns:
+        list: offsets of the copies that still need to be instanced (INSTANCE mode)
+    """
     dx = (stop.x - start.x) / (count + 1)
     dy = (stop.y - start.y) / (count + 1)
     dz = (stop.z - start.z) / (count + 1)
 
-    for i in range(count):
-        if i == 0:
-            px, py, pz = start.x + dx, start.y + dy, start.z + dz
-            bmesh.ops.translate(bm, verts=elem['verts'], vec=(px, py, pz))
-        else:
-            faces = list({f for v in elem['verts'] for f in v.link_faces})
+    if count < 1:
+        return []
+
+    px, py, pz = start.x + dx, start.y + dy, start.z + dz
+    bmesh.ops.translate(bm, verts=elem['verts'], vec=(px, py, pz))
+
+    offsets = [Vector((dx * i, dy * i, dz * i)) for i in range(1, count)]
+    faces = list({f for v in elem['verts'] for f in v.link_faces})
+    if mode == 'INSTANCE':
+        return offsets
+
+    if mode == 'BATCH':
+        touch_verts(bm, copy_elements(bm, faces, offsets))
+    else:
+        for off in offsets:
             ret = bmesh.ops.duplicate(bm, geom=faces)
-            bmesh.ops.translate(bm, verts=filter_geom(ret['geom'], BMVert), vec=(dx * i, dy * i, dz * i))
+            bmesh.ops.translate(bm, verts=filter_geom(ret['geom'], BMVert), vec=off)
+            touch_verts(bm, filter_geom(ret['geom'], BMVert))
+    return []
+
+def copy_elements(bm, faces, offsets):
+    """ Create translated copies of faces in one pass from an array of offsets """
+    verts = list({v for f in faces for v in f.verts})
+    index = {v: i for i, v in enumerate(verts)}
+    coords = [v.co.copy() for v in verts]
+    loops = [(f, [index[v] for v in f.verts]) for f in faces]
+
+    new_verts = []
+    for off in offsets:
+        copy = [bm.verts.new(co + off) for co in coords]
+        for f, idx in loops:
+            bm.faces.new([copy[i] for i in idx], f)
+        new_verts.extend(copy)
+    return new_verts
+
+def element_data(elem, angle):
+    """ Geometry of an element (cube geometry) centred on the origin with its z rotation removed
+
+    Vertices and faces are put in a canonical order, so elements built the same way
+    give equal data and can share one prototype.
+
+    Returns:
+        tuple: (coords, faces, center) - center is where the element sits in the mesh
+    """
+    faces = list({f for v in elem['verts'] for f in v.link_faces})
+    verts = list({v for f in faces for v in f.verts})
+    center = calc_verts_median(verts)
+    rot = Matrix.Rotation(-angle, 4, 'Z')
+    local = {v: (rot * (v.co - center)).to_tuple(5) for v in verts}
+    verts.sort(key=local.get)
+    index = {v: i for i, v in enumerate(verts)}
+
+    loops = []
+    for f in faces:
+        idx = [index[v] for v in f.verts]
+        first = idx.index(min(idx))
+        loops.append(tuple(idx[first:] + idx[:first]))
+    return tuple(local[v] for v in verts), tuple(sorted(loops)), center
+
+def instance_elements(obj, instances, size=0.01):
+    """ Place copies of elements as dupli-face instances parented to obj
+
+    Equal elements share one prototype mesh. Each prototype gets one carrier object
+    holding a small triangle per copy: dupli-faces put the prototype at the triangle
+    centre and turn it to the triangle's first edge, so every copy keeps its own
+    rotation about z. The number of objects only depends on the distinct elements.
+
+    Args:
+        obj (bpy.types.Object): object the railing is built on
+        instances (list): (coords, faces, center, angle, offsets) for each arrayed element
+        size (float): size of the carrier triangles
+    """
+    groups = {}
+    for coords, faces, center, angle, offsets in instances:
+        places = groups.setdefault((coords, faces), [])
+        places.extend((center + off, angle) for off in offsets)
+
+    scene = bpy.context.scene
+    for (coords, faces), places in groups.items():
+        proto = bpy.data.meshes.new(obj.name + "_rail_element")
+        proto.from_pydata(list(coords), [], [list(f) for f in faces])
+        proto.update()
+
+        points, tris = [], []
+        for pos, angle in places:
+            d = Vector((math.cos(angle), math.sin(angle), 0)) * size
+            q = Vector((-d.y, d.x, 0))
+            # -- counter-clockwise triangle centred on pos, first edge along d
+            tris.append(range(len(points), len(points) + 3))
+            points.extend([pos - d - q, pos + d - q, pos + 2 * q])
+        carrier = bpy.data.meshes.new(obj.name + "_rail_array")
+        carrier.from_pydata([p.to_tuple() for p in points], [], [list(t) for t in tris])
+        carrier.update()
+
+        array_obj = bpy.data.objects.new(obj.name + "_rail_array", carrier)
+        array_obj.dupli_type = 'FACES'
+        array_obj.use_dupli_faces_scale = False
+        array_obj.parent = obj
+
+        proto_obj = bpy.data.objects.new(obj.name + "_rail_element", proto)
+        proto_obj.parent = array_obj
+        scene.objects.link(array_obj)
+        scene.objects.link(proto_obj)
@@ -7,7 +7,9 @@ from .roof import register_roof, unregister_roof
 from .stairs import register_stairs, unregister_stairs
 from .floor import register_floor, unregister_floor
 from .floorplan import register_floorplan, unregister_floorplan
+from .footprints import register_footprints, unregister_footprints
 from .generic import register_generic, unregister_generic
+from ..utils import cache_prop_schemas, clear_prop_schemas
 
 
 register_funcs = [
@@ -21,6 +23,7 @@ register_funcs = [
     register_balcony,
     register_floor,
     register_floorplan,
+    register_footprints,
 
 ]
 
@@ -35,14 +38,17 @@ unregister_funcs = [
     unregister_balcony,
     unregister_floor,
     unregister_floorplan,
+    unregister_footprints,
 ]
 
 
 def register_core():
     for func in register_funcs:
         func()
+    cache_prop_schemas()
 
 
 def unregister_core():
     for func in unregister_funcs:
         func()
+    clear_prop_schemas()
@@ -4,20 +4,30 @@ import bmesh
 from .roof_types import make_roof
 from ...utils import (
     get_edit_mesh,
+    track_changes,
     kwargs_from_props
     )
 
 class Roof:
 
     @classmethod
-    def build(cls, context, props):
+    def build(cls, context, props, report=None):
+        """
+        Args:
+            context:(bpy.context)blender context
+            props:(bpy.types.PropertyGroup)RoofProperty
+            report:(function)Operator.report, 有区域没有生成屋顶时给出警告
+        """
         me = get_edit_mesh()
         bm = bmesh.from_edit_mesh(me)
         faces = [f for f in bm.faces if f.select]
 
         if cls.validate(bm):
-            make_roof(bm, faces, **kwargs_from_props(props))
+            with track_changes(bm, faces):
+                skipped = make_roof(bm, faces, **kwargs_from_props(props))
             bmesh.update_edit_mesh(me, True)
+            if skipped and report:
+                report({'WARNING'}, "No roof for {} region(s) (courtyard or invalid outline), their faces are kept".format(skipped))
             return {'FINISHED'}
         return {'CANCELLED'}
 
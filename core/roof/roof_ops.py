@@ -15,7 +15,7 @@ class RoofOperator(bpy.types.Operator):
         return context.object is not None and context.mode == "EDIT_MESH"
 
     def execute(self, context):
-        return Roof.build(context, self.props)
+        return Roof.build(context, self.props, self.report)
 
     def draw(self, context):
         self.props.draw(context, self.layout)
@@ -1,20 +1,29 @@
 import bpy
+import math
 import bmesh
 
 from bmesh.types import BMVert, BMEdge, BMFace
 from ...utils import (
     select,
     filter_geom,
+    is_simple,
+    touch_faces,
+    recalc_normals,
     )
+from ...utils.util_skeleton import cached_skeletonize
 
 def make_roof(bm, faces, type, **kwargs):
+    """
+    :return: (int)没有生成屋顶而保留原面的区域数
+    """
     select(faces, False)
     if type == 'FLAT':
         make_flat_roof(bm, faces, **kwargs)
     elif type == 'GABLE':
         make_gable_roof(bm, faces, **kwargs)
     elif type == 'HIP':
-        make_hip_roof(bm, faces, **kwargs)
+        return make_hip_roof(bm, faces, **kwargs)
+    return 0
 
 def make_flat_roof(bm, faces, thick, outset, **kwargs):
 
@@ -27,8 +36,9 @@ def make_flat_roof(bm, faces, thick, outset, **kwargs):
     link_faces = [f for e in top_face.edges for f in e.link_faces
                     if f is not top_face]
 
-    bmesh.ops.inset_region(bm, faces=link_faces, depth=outset)
-    bmesh.ops.recalc_face_normals(bm, faces=bm.faces)
+    ret = bmesh.ops.inset_region(bm, faces=link_faces, depth=outset)
+    touch_faces(bm, link_faces + ret['faces'])
+    recalc_normals(bm)
 
     bmesh.ops.delete(bm,
         geom=faces,
@@ -45,8 +55,236 @@ def make_gable_roof(bm, faces, **kwargs):
         pass
 
 
-def make_hip_roof(bm, faces, **kwargs):
-    pass
+def make_hip_roof(bm, faces, thick, outset, height, **kwargs):
+    """
+    由选中面的直骨架生成四坡屋顶, 所有顶点和面一次性创建
+    带内环(天井)的区域不生成屋顶, 与其它跳过的区域一样保留原有的面
+    :param thick: (float)屋檐封檐板厚度
+    :param outset: (float)屋檐外延长度
+    :param height: (float)屋脊高度
+    :return: (int)跳过的区域数
+    """
+    all_loops = boundary_loops(faces)
+    loops = [l for l in all_loops if _signed_area([v.co.xy for v in l]) > 0]
+    if not loops:
+        return 0
+
+    # --内环(顺时针)的顶点落在哪个外环的区域中, 该区域就带有天井, 屋顶不能把它盖住
+    hole_verts = {v for l in all_loops if _signed_area([v.co.xy for v in l]) < 0 for v in l}
+    regions = {id(loop): loop_region(loop, faces) for loop in loops}
+    courtyard = [any(v in hole_verts for f in regions[id(loop)] for v in f.verts) for loop in loops]
+    skipped = [loop for loop, holed in zip(loops, courtyard) if holed]
+    loops = [loop for loop, holed in zip(loops, courtyard) if not holed]
+
+    rings = [offset_loop([v.co.xy for v in loop], outset) for loop in loops]
+    # --外延后自相交的环(凹角处外延过大)没有有效的直骨架, 在生成任何几何之前跳过
+    simple = [is_simple(ring) for ring in rings]
+    skipped.extend(loop for loop, ok in zip(loops, simple) if not ok)
+    loops = [loop for loop, ok in zip(loops, simple) if ok]
+    rings = [ring for ring, ok in zip(rings, simple) if ok]
+
+    new_faces = []
+    for loop, ring in zip(loops, rings):
+        nodes, roof_faces = hip_roof_faces(ring)
+        # --直骨架不完整时屋面只覆盖外环的一部分, 跳过这个环
+        if not covers_ring(ring, nodes, roof_faces):
+            skipped.append(loop)
+            continue
+
+        # --屋檐: 底面(soffit)和封檐板(fascia), 高度取这个环自己的最高点
+        z = max(v.co.z for v in loop)
+        low = [bm.verts.new((x, y, z)) for x, y in ring]
+        high = [bm.verts.new((x, y, z + thick)) for x, y in ring]
+        for i in range(len(loop)):
+            j = (i + 1) % len(loop)
+            new_faces.append(bm.faces.new((loop[i], loop[j], low[j], low[i])))
+            new_faces.append(bm.faces.new((low[i], low[j], high[j], high[i])))
+
+        # --屋面, 前len(ring)个节点即为外环
+        max_height = max(h for x, y, h in nodes) or 1.0
+        verts = high + [bm.verts.new((x, y, z + thick + height * h / max_height))
+                        for x, y, h in nodes[len(ring):]]
+        new_faces.extend(bm.faces.new([verts[i] for i in face]) for face in roof_faces)
+
+    touch_faces(bm, new_faces)
+    recalc_normals(bm)
+
+    # --跳过的环所在区域保留原有的面
+    keep = set()
+    for loop in skipped:
+        keep.update(regions[id(loop)])
+    bmesh.ops.delete(bm,
+        geom=[f for f in faces if f not in keep],
+        context=5)
+    return len(skipped)
+
+
+def boundary_loops(faces):
+    """
+    选中面区域的边界环, 按面的绕向排列(法线向上时外环逆时针, 内环顺时针)
+    :return: [[BMVert, ...], ...]
+    """
+    faces = set(faces)
+    flip = sum(f.normal.z for f in faces) < 0
+    following = {}
+    for f in faces:
+        for l in f.loops:
+            if len([lf for lf in l.edge.link_faces if lf in faces]) == 1:
+                a, b = l.vert, l.link_loop_next.vert
+                if flip:
+                    a, b = b, a
+                following[a] = b
+
+    loops = []
+    while following:
+        start, v = following.popitem()
+        loop = [start]
+        while v is not start and v in following:
+            loop.append(v)
+            v = following.pop(v)
+        if v is start and len(loop) > 2:
+            loops.append(loop)
+    return loops
+
+
+def loop_region(loop, faces):
+    """
+    外环所围的选中面: 从外环第一条边上的选中面出发, 经选中面之间的边连通的所有面
+    """
+    faces = set(faces)
+    edge = next(e for e in loop[0].link_edges if e.other_vert(loop[0]) is loop[1])
+    stack = [f for f in edge.link_faces if f in faces]
+    region = set(stack)
+    while stack:
+        f = stack.pop()
+        for e in f.edges:
+            for lf in e.link_faces:
+                if lf in faces and lf not in region:
+                    region.add(lf)
+                    stack.append(lf)
+    return region
+
+
+def offset_loop(points, dist):
+    """
+    将环的每条边沿其右侧法线(逆时针外环的外侧)平移dist
+    :param points: [(x, y), ...]
+    """
+    result = []
+    n = len(points)
+    for i in range(n):
+        (x0, y0), (x1, y1), (x2, y2) = points[i - 1], points[i], points[(i + 1) % n]
+        n1 = _right_normal(x1 - x0, y1 - y0)
+        n2 = _right_normal(x2 - x1, y2 - y1)
+        denom = 1 + n1[0] * n2[0] + n1[1] * n2[1]
+        if denom < 1e-6:
+            mx, my = n1
+        else:
+            mx, my = (n1[0] + n2[0]) / denom, (n1[1] + n2[1]) / denom
+        result.append((x1 + mx * dist, y1 + my * dist))
+    return result
+
+
+def hip_roof_faces(ring, arcs=None):
+    """
+    由直骨架计算屋面
+    :param ring: [(x, y), ...] 逆时针外环
+    :param arcs: 已算好的ring[::-1]的直骨架, 为None时在此计算
+    :return: (nodes, faces), nodes为[(x, y, h), ...], 前len(ring)个为外环的点(h=0), 其余为骨架节点;
+             faces为每个屋面的节点索引列表
+    """
+    nodes = [(x, y, 0.0) for x, y in ring]
+    index = {_node_key(co): i for i, co in enumerate(ring)}
+
+    def node(x, y, h):
+        key = _node_key((x, y))
+        if key not in index:
+            index[key] = len(nodes)
+            nodes.append((x, y, h))
+        return index[key]
+
+    count = len(ring)
+    links = [{(i - 1) % count, (i + 1) % count} for i in range(count)]
+
+    # --skeletonize在y轴向上的坐标系中要求外环为顺时针
+    if arcs is None:
+        arcs = cached_skeletonize(ring[::-1])
+    for arc in arcs:
+        src = node(arc.source.x, arc.source.y, arc.height)
+        for sink in arc.sinks:
+            dst = node(sink.x, sink.y, 0.0)
+            links.extend(set() for _ in range(len(nodes) - len(links)))
+            if dst != src:
+                links[src].add(dst)
+                links[dst].add(src)
+
+    # --多个事件同时发生时skeletonize可能漏掉某个角点的骨架边, 将其连到角平分线上最近的骨架节点
+    for i in range(count):
+        if len(links[i]) > 2 or count == len(nodes):
+            continue
+        (xa, ya, _), (xb, yb, _), (xc, yc, _) = nodes[i - 1], nodes[i], nodes[(i + 1) % count]
+        n1, n2 = _right_normal(xb - xa, yb - ya), _right_normal(xc - xb, yc - yb)
+        dx, dy = -(n1[0] + n2[0]), -(n1[1] + n2[1])
+        d = math.sqrt(dx * dx + dy * dy)
+        if d < 1e-6:
+            continue
+
+        def off_bisector(j):
+            rx, ry = nodes[j][0] - xb, nodes[j][1] - yb
+            if rx * dx + ry * dy <= 0:
+                return float('inf')
+            return abs(ry * dx - rx * dy) / d
+        j = min(range(count, len(nodes)), key=off_bisector)
+        if off_bisector(j) < 1e-4:
+            links[i].add(j)
+            links[j].add(i)
+
+    # --每个节点的相邻节点按角度(逆时针)排序
+    around = []
+    for i, linked in enumerate(links):
+        x, y = nodes[i][:2]
+        around.append(sorted(linked, key=lambda j: math.atan2(nodes[j][1] - y, nodes[j][0] - x)))
+
+    # --沿每条外环边遍历其左侧的区域
+    faces = []
+    visited = set()
+    for a in range(count):
+        face = [a]
+        u, v = a, (a + 1) % count
+        while (u, v) not in visited and len(face) <= len(nodes):
+            visited.add((u, v))
+            if v == a:
+                break
+            face.append(v)
+            ring_v = around[v]
+            u, v = v, ring_v[ring_v.index(u) - 1]
+        if v == a and len(face) > 2:
+            faces.append(face)
+    return nodes, faces
+
+
+def covers_ring(ring, nodes, faces, tol=1e-3):
+    """
+    屋面的投影面积之和是否等于外环的面积(相对误差tol以内)
+    直骨架漏掉事件时屋面只覆盖外环的一部分
+    """
+    area = _signed_area(ring)
+    covered = sum(_signed_area([nodes[i][:2] for i in face]) for face in faces)
+    return area > 0 and abs(covered - area) <= tol * area
+
+
+def _node_key(co):
+    return round(co[0], 5), round(co[1], 5)
+
+
+def _right_normal(dx, dy):
+    d = math.sqrt(dx * dx + dy * dy) or 1.0
+    return dy / d, -dx / d
+
+
+def _signed_area(points):
+    return sum(x0 * y1 - x1 * y0 for (x0, y0), (x1, y1) in zip(points, points[1:] + points[:1])) / 2
+
 
 def rectangular_area(faces):
     face_area = sum([f.calc_area() for f in faces])
@@ -3,6 +3,7 @@ import bmesh
 from .stairs_types import make_stairs
 from ...utils import (
     get_edit_mesh,
+    track_changes,
     kwargs_from_props
     )
 
@@ -22,7 +23,8 @@ class Stairs:
         faces = [f for f in bm.faces if f.select]
 
         if cls.validate(faces):
-            make_stairs(bm, faces, **kwargs_from_props(props))
+            with track_changes(bm, faces):
+                make_stairs(bm, faces, **kwargs_from_props(props))
             bmesh.update_edit_mesh(me, True)
             return {'FINISHED'}
         return {'CANCELLED'}
@@ -1,6 +1,6 @@
 import bmesh
 from .window_types import make_window
-from ...utils import (get_edit_mesh, kwargs_from_props)
+from ...utils import (get_edit_mesh, track_changes, kwargs_from_props)
 
 
 class Window:
@@ -12,7 +12,8 @@ class Window:
         faces = [face for face in bm.faces if face.select]  # 找出被选中的面
 
         if cls.validate(faces):
-            make_window(bm, faces, **kwargs_from_props(props))
+            with track_changes(bm, faces):
+                make_window(bm, faces, **kwargs_from_props(props))
             bmesh.update_edit_mesh(me, True)
             return {'FINISHED'}
         return {'CANCELLED'}
@@ -1,18 +1,22 @@
 import bmesh
-from ...utils import (split, get_edit_mesh)
+from ...utils import (split, weld_verts, touch_verts, get_edit_mesh, recalc_normals, Logger)
 from ..fill import (fill_bar, fill_louver, fill_glass_panes)
 
+logger = Logger(__name__)
+
 
 def make_window(bm, faces, **kwargs):
     """创建窗户"""
     for face in faces:
         if face.normal.z:
             continue
-        face = make_window_split(bm, face, **kwargs)
+        with logger.stage('split', bm):
+            face = make_window_split(bm, face, **kwargs)
         if not face:
             continue
         face = make_window_frame(bm, face, **kwargs)
-        make_window_fill(bm, face, **kwargs)
+        with logger.stage('fill', bm):
+            make_window_fill(bm, face, **kwargs)
 
 
 def make_window_split(bm, face, size, off, **kwargs):
@@ -32,15 +36,21 @@ def make_window_frame(bm, face, ft, fd, **kwargs):
     :param fd:(float)Depth of the window frame
     :param ft:(float)thickness of the window frame
     """
-    bmesh.ops.remove_doubles(bm, verts=list(bm.verts))
-    face = bmesh.ops.extrude_discrete_faces(bm, faces=[face]).get('faces')[-1]
-    bmesh.ops.translate(bm, verts=face.verts, vec=face.normal*fd/2)
+    weld_verts(bm)
+    with logger.stage('frame_extrude', bm):
+        face = bmesh.ops.extrude_discrete_faces(bm, faces=[face]).get('faces')[-1]
+        bmesh.ops.translate(bm, verts=face.verts, vec=face.normal*fd/2)
+        touch_verts(bm, face.verts)
     if ft:
-        bmesh.ops.inset_individual(bm, faces=[face], thickness=ft)
-    bmesh.ops.recalc_face_normals(bm, faces=list(bm.faces))
+        with logger.stage('inset', bm):
+            inset = bmesh.ops.inset_individual(bm, faces=[face], thickness=ft).get('faces')
+            touch_verts(bm, {v for f in inset for v in f.verts})
+    recalc_normals(bm)
     if fd:
-        f = bmesh.ops.extrude_discrete_faces(bm, faces=[face]).get('faces')[-1]
-        bmesh.ops.translate(bm, verts=f.verts, vec=-f.normal*fd)
+        with logger.stage('frame_depth', bm):
+            f = bmesh.ops.extrude_discrete_faces(bm, faces=[face]).get('faces')[-1]
+            bmesh.ops.translate(bm, verts=f.verts, vec=-f.normal*fd)
+            touch_verts(bm, f.verts)
 
         return f
     return face
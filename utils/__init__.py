@@ -3,4 +3,23 @@ from .util_geometry import *
 from .util_mesh import *
 from .util_object import *
 from .util_material import *
-from .util_logging import Logger
\ No newline at end of file
+from .util_footprint import (
+    is_simple,
+    signed_area,
+    validate_ring,
+    validate_rings,
+    FootprintReport
+)
+from .util_floorplan import (
+    composite_coords,
+    hshaped_coords,
+    random_coords,
+    random_coords_many
+)
+from .util_logging import (
+    Logger,
+    ProfileRecorder,
+    enable_profiling,
+    disable_profiling,
+    profiling_enabled
+)
@@ -25,26 +25,107 @@ def args_from_props(props, names):
     return tuple(getattr(props, name) for name in names)
 
 
+_valid_types = (
+    int, float, str, tuple, bool, Vector,
+    bpy.types.Material,
+    bpy.types.Object
+)
+
+# 属性取值表缓存 {PropertyGroup类: [(key, path, checked)]}
+_prop_schemas = {}
+
+
+def prop_schema(cls):
+    """
+    返回PropertyGroup类的扁平化取值表(按类缓存)
+    每一项为(key, path, checked): path为从根属性组到该属性的属性名序列,
+    checked为True时取值后仍需做类型检查(数组、指针、多选枚举等)
+    """
+    schema = _prop_schemas.get(cls)
+    if schema is not None:
+        return schema
+
+    schema = []
+    rna_props = cls.bl_rna.properties
+    # 与dir()相同的字母顺序，保证同名属性的覆盖顺序不变
+    for name in sorted(rna_props.keys()):
+        if name == 'rna_type':
+            continue
+        rna = rna_props[name]
+
+        if rna.type == 'POINTER':
+            sub_cls = getattr(bpy.types, rna.fixed_type.identifier, None)
+            if sub_cls is not None and issubclass(sub_cls, bpy.types.PropertyGroup):
+                if sub_cls is not cls:
+                    schema.extend((key, (name,) + path, checked)
+                                  for key, path, checked in prop_schema(sub_cls))
+                continue
+            schema.append((name, (name,), True))
+        elif rna.type == 'COLLECTION':
+            continue
+        else:
+            checked = getattr(rna, 'array_length', 0) > 0 or getattr(rna, 'is_enum_flag', False)
+            schema.append((name, (name,), checked))
+
+    _prop_schemas[cls] = schema
+    return schema
+
+
+def cache_prop_schemas():
+    """注册时为本插件的所有PropertyGroup类预先生成取值表"""
+    root = __name__.split('.')[0]
+    for cls in bpy.types.PropertyGroup.__subclasses__():
+        if cls.__module__.split('.')[0] == root:
+            _prop_schemas.pop(cls, None)
+            prop_schema(cls)
+
+
+def clear_prop_schemas():
+    _prop_schemas.clear()
+
+
 def kwargs_from_props(props):
-    valid_types = (
-        int, float, str, tuple, bool, Vector,
-        bpy.types.Material,
-        bpy.types.Object
-    )
+    """将属性组(含嵌套属性组)转换为关键字参数"""
+    result = {}
+    for key, path, checked in prop_schema(type(props)):
+        val = props
+        for name in path:
+            val = getattr(val, name)
+        if not checked or isinstance(val, _valid_types):
+            result[key] = val
+    return result
 
+
+def _kwargs_from_props_dir(props):
+    """基于dir()逐个检查属性的转换方式(用于性能对比)"""
     result = {}
     for p in dir(props):
         if p.startswith('__') or p in ['rna_type', 'bl_rna']:
             continue
         prop = getattr(props, p)
 
-        if isinstance(prop, valid_types):
+        if isinstance(prop, _valid_types):
             result[p] = prop
-        elif isinstance(prop, bpy.types.PropertyGroup) and not isinstance(prop,type(props)):
-            result.update(kwargs_from_props(prop))
+        elif isinstance(prop, bpy.types.PropertyGroup) and not isinstance(prop, type(props)):
+            result.update(_kwargs_from_props_dir(prop))
     return result
 
 
+def bench_kwargs_from_props(props, number=1000):
+    """
+    对比dir()方式与取值表方式转换属性的耗时
+    :return: (dict)每次调用的平均耗时(秒)
+    """
+    import timeit
+    before = timeit.timeit(lambda: _kwargs_from_props_dir(props), number=number)
+    after = timeit.timeit(lambda: kwargs_from_props(props), number=number)
+    return {
+        'dir': before / number,
+        'schema': after / number,
+        'speedup': before / after if after else float('inf')
+    }
+
+
 def assert_test(func):
     """
     捕获func中的异常
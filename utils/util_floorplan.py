@@ -0,0 +1,163 @@
+import os
+import sys
+import math
+import random
+
+# 布局形状的二维顶点坐标和面, 不依赖bpy/bmesh, 可以在Blender之外(如进程池中)批量生成
+# 结果由core/floorplan/floorplan_types.py中的fp_*函数转换为网格
+
+
+def _ccw_face(coords, face):
+    """将面的顶点顺序调整为逆时针(法向朝+z)"""
+    area = sum(coords[i][0] * coords[j][1] - coords[j][0] * coords[i][1]
+               for i, j in zip(face, face[1:] + face[:1]))
+    return face if area > 0 else face[::-1]
+
+
+def composite_coords(width, length, tl1, tl2, tl3, tl4):
+    """
+    十字架形状的顶点坐标和面(逆时针), 内部矩形为[-width, width] x [-length, length]
+    :return: (coords, faces)
+    """
+    w, l = width, length
+    coords = [(-w, -l, 0), (w, -l, 0), (w, l, 0), (-w, l, 0)]
+    faces = [[0, 1, 2, 3]]
+
+    # 底部, 左侧, 右侧, 顶部各伸出一个与内部矩形等宽的矩形
+    arms = [
+        (tl1, 0, 1, (0, -tl1)),
+        (tl2, 3, 0, (-tl2, 0)),
+        (tl3, 1, 2, (tl3, 0)),
+        (tl4, 2, 3, (0, tl4)),
+    ]
+    for ext, a, b, (dx, dy) in arms:
+        if ext > 0:
+            n = len(coords)
+            for i in (a, b):
+                x, y, z = coords[i]
+                coords.append((x + dx, y + dy, z))
+            faces.append(_ccw_face(coords, [a, b, n + 1, n]))
+    return coords, faces
+
+
+def hshaped_coords(width, length, tl1, tl2, tl3, tl4, tw1, tw2, tw3, tw4):
+    """
+    H形的顶点坐标和面(逆时针), 与逐步挤出边的做法结果相同:
+    内部矩形[-width, width] x [-length, length]左右各伸出宽为1的矩形,
+    两侧矩形的四个角再沿y方向伸出, 伸出方向取该边中点的单位方向
+    :return: (coords, faces)
+    """
+    w, l = width, length
+    coords = [
+        [-w, -l, 0], [w, -l, 0], [w, l, 0], [-w, l, 0],
+        [-w - 1, -l, 0], [-w - 1, l, 0], [w + 1, -l, 0], [w + 1, l, 0],
+    ]
+    faces = [[0, 1, 2, 3], [4, 0, 3, 5], [1, 6, 7, 2]]
+
+    # (伸出长度, 宽度, 内侧顶点, 外侧顶点): 左下, 右下, 左上, 右上
+    tails = [(tl1, tw1, 0, 4), (tl2, tw2, 1, 6), (tl3, tw3, 3, 5), (tl4, tw4, 2, 7)]
+    norm = math.hypot(w + .5, l)
+    for ext, tw, inner, outer in tails:
+        if ext > 0:
+            # 边中点(±(w + .5), ±l)的单位方向
+            vx = math.copysign(w + .5, coords[outer][0]) / norm
+            vy = math.copysign(l, coords[outer][1]) / norm
+            dy, dx = vy * ext, -vx * tw
+
+            coords[inner][0] += dx
+            n = len(coords)
+            coords.append([coords[inner][0], coords[inner][1] + dy, 0])
+            coords.append([coords[outer][0], coords[outer][1] + dy, 0])
+
+            faces.append(_ccw_face(coords, [inner, outer, n + 1, n]))
+    return [tuple(co) for co in coords], faces
+
+
+def random_coords(seed, width, length):
+    """
+    随机形状建筑地基的顶点坐标和面(逆时针), 不依赖bmesh和全局随机状态
+    矩形[-width, width] x [-length, length]中随机选取几条边, 每条边三等分后中间一段随机放大,
+    并随机平移后向外挤出; 同一个seed得到的形状不保证与原先逐步修改网格的做法相同
+    :param seed: (int)每个地块独立的random.Random(seed)
+    :return: (coords, faces)
+    """
+    rng = random.Random(seed)
+    w, l = width, length
+    corners = [(-w, -l), (w, -l), (w, l), (-w, l)]
+    # 矩形的四条边: 下, 右, 上, 左 (顺着面的方向)
+    sample = rng.sample(range(4), rng.randrange(1, 4))
+
+    splits = {}
+    for idx in sample:
+        (ax, ay), (bx, by) = corners[idx], corners[(idx + 1) % 4]
+        cx, cy = (ax + bx) / 2, (ay + by) / 2
+        elen = math.hypot(bx - ax, by - ay)
+        ux, uy = (1, 0) if ay == by else (0, 1)
+
+        # 中间一段(原长的1/3)以边的中点为中心放大
+        seg = elen / 3
+        half = seg * max(min(rng.random() * elen / seg, 2.95), 1) / 2
+        p = [cx - ux * half, cy - uy * half]
+        q = [cx + ux * half, cy + uy * half]
+
+        tab = None
+        if rng.choice([0, 1]):
+            offset = rng.random() * (elen - 2 * half) / 2
+            for co in (p, q):
+                co[0] += ux * offset
+                co[1] += uy * offset
+
+            depth = rng.randrange(1, int(elen / 2))
+            norm = math.hypot(cx, cy)
+            nx, ny = cx / norm * depth, cy / norm * depth
+            tab = ((p[0] + nx, p[1] + ny), (q[0] + nx, q[1] + ny))
+
+        # 沿面的方向排列两个切割点
+        pts = [tuple(p), tuple(q)]
+        if (bx - ax) * ux + (by - ay) * uy < 0:
+            pts.reverse()
+            if tab:
+                tab = tab[::-1]
+        splits[idx] = (pts, tab)
+
+    coords = []
+    outline = []
+    tabs = []
+    for idx, corner in enumerate(corners):
+        outline.append(len(coords))
+        coords.append(corner)
+        if idx in splits:
+            pts, tab = splits[idx]
+            n = len(coords)
+            outline.extend((n, n + 1))
+            coords.extend(pts)
+            if tab:
+                coords.extend(tab)
+                tabs.append([n, n + 1, n + 3, n + 2])
+
+    coords = [(x, y, 0) for x, y in coords]
+    return coords, [outline] + [_ccw_face(coords, f) for f in tabs]
+
+
+def _random_chunk(chunk):
+    """进程池中处理一组(seed, width, length)"""
+    return [random_coords(seed, width, length) for seed, width, length in chunk]
+
+
+def random_coords_many(lots, workers=None, chunksize=32, executor=None):
+    """
+    在进程池中批量生成随机形状地基, 按输入顺序逐个返回(coords, faces), 与逐个调用random_coords结果相同
+    只能在Blender之外使用(见util_pool), 网格在最后用mesh_from_coords生成
+    :param lots: (iterable)(seed, width, length)
+    :param workers: (int)进程数, 默认为cpu数量; 为1时在当前进程中执行
+    :param executor: 可传入已有的concurrent.futures执行器以复用进程池
+    """
+    try:
+        from .util_pool import map_chunks
+    except ImportError:
+        # 单独加载本模块时(见benchmarks/bench_floorplan.py), util_pool在同一目录下
+        path = os.path.dirname(os.path.abspath(__file__))
+        if path not in sys.path:
+            sys.path.append(path)
+        from util_pool import map_chunks
+    return map_chunks(_random_chunk, lots, workers, chunksize, executor)
@@ -0,0 +1,285 @@
+import math
+import numpy as np
+import itertools as it
+from collections import Counter
+
+# 建筑轮廓(二维多边形)的检查与修复, 在任何bmesh操作之前进行
+
+
+def _ring_array(ring):
+    co = np.asarray(ring, dtype=np.float64)
+    if co.ndim != 2 or co.shape[0] == 0 or co.shape[1] < 2:
+        return np.zeros((0, 2))
+    return co[:, :2]
+
+
+def _open_ring(ring):
+    """去掉与起点完全相同的闭合点(GeoJSON等格式中环的最后一个点), 不算作问题"""
+    try:
+        if len(ring) > 1 and tuple(ring[0][:2]) == tuple(ring[-1][:2]):
+            return ring[:-1]
+    except (TypeError, IndexError):
+        pass
+    return ring
+
+
+def _drop_repeated(co, tol):
+    """去掉与前一个点重合的点(零长度的边), 包括与起点重合的闭合点"""
+    if len(co) < 2:
+        return co
+    step = np.hypot(*(co - np.roll(co, 1, axis=0)).T)
+    keep = step > tol
+    if not keep.any():
+        return co[:1]
+    return co[keep]
+
+
+def _drop_collinear(co, tol):
+    """
+    反复去掉与前后两点共线的点(直线上的多余点以及折返的尖刺)
+    以叉积除以两边长度之和作为到直线的距离尺度
+    """
+    while len(co) >= 3:
+        prev = np.roll(co, 1, axis=0)
+        nxt = np.roll(co, -1, axis=0)
+        a, b = co - prev, nxt - co
+        cross = a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0]
+        scale = np.hypot(*a.T) + np.hypot(*b.T)
+        flat = np.abs(cross) <= tol * scale
+        if not flat.any():
+            break
+        # 相邻的共线点一次只去掉一个, 避免把整段都删掉
+        drop = flat & ~np.roll(flat, 1)
+        if not drop.any():
+            drop[np.argmax(flat)] = True
+        co = _drop_repeated(co[~drop], tol)
+    return co
+
+
+def signed_area(co):
+    """多边形的有向面积(逆时针为正)"""
+    co = _ring_array(co)
+    x, y = co[:, 0], co[:, 1]
+    return 0.5 * float(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y))
+
+
+def _is_convex(co):
+    """所有转角同向且总转角为一周的多边形是简单的(凸多边形), 无需扫描"""
+    a = co - np.roll(co, 1, axis=0)
+    b = np.roll(co, -1, axis=0) - co
+    cross = a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0]
+    if not ((cross > 0).all() or (cross < 0).all()):
+        return False
+    turn = np.arctan2(cross, (a * b).sum(axis=1))
+    return abs(abs(turn.sum()) - 2 * math.pi) < 1e-6
+
+
+def _orient(ax, ay, bx, by, cx, cy):
+    val = (bx - ax) * (cy - ay) - (by - ay) * (cx - ax)
+    return (val > 0) - (val < 0)
+
+
+def _on_segment(ax, ay, bx, by, cx, cy):
+    return min(ax, bx) <= cx <= max(ax, bx) and min(ay, by) <= cy <= max(ay, by)
+
+
+def _segments_cross(s, t):
+    """两条线段是否相交(包括端点接触和共线重叠)"""
+    (ax, ay, bx, by), (cx, cy, dx, dy) = s, t
+    o1 = _orient(ax, ay, bx, by, cx, cy)
+    o2 = _orient(ax, ay, bx, by, dx, dy)
+    o3 = _orient(cx, cy, dx, dy, ax, ay)
+    o4 = _orient(cx, cy, dx, dy, bx, by)
+    if o1 != o2 and o3 != o4:
+        return True
+    return ((o1 == 0 and _on_segment(ax, ay, bx, by, cx, cy)) or
+            (o2 == 0 and _on_segment(ax, ay, bx, by, dx, dy)) or
+            (o3 == 0 and _on_segment(cx, cy, dx, dy, ax, ay)) or
+            (o4 == 0 and _on_segment(cx, cy, dx, dy, bx, by)))
+
+
+def is_simple(ring):
+    """
+    多边形的边是否互不相交(相邻的边只在公共顶点处相接)
+    Shamos-Hoey扫描线: 按x排序端点, 只检查扫描线上相邻的边, 发现第一个交点即返回
+    """
+    co = _ring_array(ring)
+    n = len(co)
+    if n < 3:
+        return False
+    if _is_convex(co):
+        return True
+    # 不相邻的边在顶点处相接
+    if len(np.unique(co, axis=0)) < n:
+        return False
+
+    # 每条边的左端点在前, 竖直的边下端点在前
+    start, end = co, np.roll(co, -1, axis=0)
+    swap = (start[:, 0] > end[:, 0]) | ((start[:, 0] == end[:, 0]) & (start[:, 1] > end[:, 1]))
+    left = np.where(swap[:, None], end, start)
+    right = np.where(swap[:, None], start, end)
+    segs = np.hstack([left, right]).tolist()
+    dx = right[:, 0] - left[:, 0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = np.where(dx > 0, (right[:, 1] - left[:, 1]) / dx, np.inf).tolist()
+
+    # 事件: (x, y, 类型, 边), 同一点上先插入(0)后删除(1), 在一点相接的边会同时在扫描线上
+    events = sorted([(s[0], s[1], 0, i) for i, s in enumerate(segs)] +
+                    [(s[2], s[3], 1, i) for i, s in enumerate(segs)])
+
+    def key(i, x):
+        ax, ay, bx, by = segs[i]
+        y = ay if bx == ax else ay + (by - ay) * (x - ax) / (bx - ax)
+        return y, slope[i]
+
+    def crosses(i, j):
+        if abs(i - j) in (1, n - 1):
+            # 相邻的边: 除公共顶点外还有交点, 只可能是共线重叠
+            k = i if (i + 1) % n == j else j
+            a, b, c = co[k], co[(k + 1) % n], co[(k + 2) % n]
+            cross = (b[0] - a[0]) * (c[1] - b[1]) - (b[1] - a[1]) * (c[0] - b[0])
+            return cross == 0 and (b[0] - a[0]) * (c[0] - b[0]) + (b[1] - a[1]) * (c[1] - b[1]) < 0
+        return _segments_cross(segs[i], segs[j])
+
+    active = []
+    for x, y, kind, i in events:
+        if kind == 0:
+            k = key(i, x)
+            lo, hi = 0, len(active)
+            while lo < hi:
+                mid = (lo + hi) // 2
+                if key(active[mid], x) < k:
+                    lo = mid + 1
+                else:
+                    hi = mid
+            active.insert(lo, i)
+            if lo > 0 and crosses(active[lo - 1], i):
+                return False
+            if lo + 1 < len(active) and crosses(i, active[lo + 1]):
+                return False
+        else:
+            pos = active.index(i)
+            del active[pos]
+            if 0 < pos < len(active) and crosses(active[pos - 1], active[pos]):
+                return False
+    return True
+
+
+def validate_ring(ring, tol=1e-6, repair=True):
+    """
+    检查并修复一个轮廓, 与起点相同的闭合点直接去掉
+    修复: 去掉重复点/零长度边、共线点与尖刺, 调整为逆时针
+    拒绝: 点数不足、自相交、面积为零
+    :param tol: (float)长度容差(世界单位)
+    :param repair: (bool)为False时有任何问题都拒绝
+    :return: (ring, issues) ring为[(x, y), ...], 被拒绝时为None; issues为发现的问题名称列表
+    """
+    issues = []
+    co = _ring_array(_open_ring(ring))
+    n = len(co)
+
+    co = _drop_repeated(co, tol)
+    if len(co) < n:
+        issues.append('duplicate_vertices')
+    n = len(co)
+    co = _drop_collinear(co, tol)
+    if len(co) < n:
+        issues.append('collinear_vertices')
+
+    if len(co) < 3:
+        issues.append('too_few_vertices')
+        return None, issues
+    # 自相交的环(如8字形)面积可能正好抵消, 先检查相交
+    if not is_simple(co):
+        issues.append('self_intersecting')
+        return None, issues
+    area = signed_area(co)
+    if abs(area) <= tol * tol:
+        issues.append('zero_area')
+        return None, issues
+    if area < 0:
+        issues.append('winding')
+        co = co[::-1]
+    if issues and not repair:
+        return None, issues
+    return [tuple(p) for p in co.tolist()], issues
+
+
+class FootprintReport(Counter):
+    """一批轮廓的检查结果计数: valid/repaired/rejected以及各类问题的数量"""
+
+    def add(self, ring, issues):
+        self.update(issues)
+        self['rejected' if ring is None else 'repaired' if issues else 'valid'] += 1
+
+    def summary(self):
+        return ', '.join('{} {}'.format(self[k], k) for k in ('valid', 'repaired', 'rejected')) + \
+            ''.join('; {} {}'.format(v, k) for k, v in sorted(self.items())
+                    if k not in ('valid', 'repaired', 'rejected'))
+
+
+def _batch_convex(rings, tol):
+    """
+    对一批轮廓一次性做向量化检查, 返回每个轮廓的标记:
+    1为无重复点/共线点的逆时针凸多边形, -1为同样条件下的顺时针凸多边形, 0为需要逐个检查
+    """
+    flags = np.zeros(len(rings), dtype=np.int8)
+    lens = np.array([len(r) for r in rings])
+    use = np.flatnonzero(lens >= 3)
+    if not len(use):
+        return flags
+    try:
+        co = np.array([p[:2] for i in use for p in rings[i]], dtype=np.float64)
+    except (TypeError, ValueError):
+        return flags
+    if co.ndim != 2 or co.shape[1] != 2:
+        return flags
+
+    counts = lens[use]
+    ends = np.cumsum(counts)
+    starts = ends - counts
+    idx = np.arange(len(co))
+    nxt, prv = idx + 1, idx - 1
+    nxt[ends - 1] = starts
+    prv[starts] = ends - 1
+
+    a, b = co - co[prv], co[nxt] - co
+    la, lb = np.hypot(*a.T), np.hypot(*b.T)
+    cross = a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0]
+    clean = (lb > tol) & (np.abs(cross) > tol * (la + lb))
+    turn = np.arctan2(cross, (a * b).sum(axis=1))
+
+    clean = np.logical_and.reduceat(clean, starts)
+    ccw = np.logical_and.reduceat(cross > 0, starts)
+    cw = np.logical_and.reduceat(cross < 0, starts)
+    once = np.abs(np.abs(np.add.reduceat(turn, starts)) - 2 * math.pi) < 1e-6
+    ok = clean & once
+    flags[use] = np.where(ok & ccw, 1, np.where(ok & cw, -1, 0))
+    return flags
+
+
+def validate_rings(rings, report=None, tol=1e-6, repair=True, chunk_size=4096):
+    """
+    检查一批轮廓, 只返回通过(或已修复)的轮廓
+    每chunk_size个轮廓先一次性向量化检查, 干净的凸多边形直接通过, 其余逐个检查
+    :param report: (FootprintReport)累计计数, 为None时新建
+    :return: 生成器, 依次产生(序号, 轮廓)
+    """
+    report = FootprintReport() if report is None else report
+    rings = iter(rings)
+    offset = 0
+    while True:
+        chunk = [_open_ring(ring) for ring in it.islice(rings, chunk_size)]
+        if not chunk:
+            return
+        for i, (ring, flag) in enumerate(zip(chunk, _batch_convex(chunk, tol))):
+            if flag > 0:
+                ring, issues = [(float(p[0]), float(p[1])) for p in ring], []
+            elif flag < 0 and repair:
+                ring, issues = [(float(p[0]), float(p[1])) for p in reversed(ring)], ['winding']
+            else:
+                ring, issues = validate_ring(ring, tol, repair)
+            report.add(ring, issues)
+            if ring is not None:
+                yield offset + i, ring
+        offset += len(chunk)
@@ -1,3 +1,4 @@
+import math
 import bmesh
 from mathutils import Matrix
 
@@ -23,6 +24,19 @@ def plane(bm, width=2, length=2):
     return ret
 
 
+def segments_for_error(radius, chord_error, min_segs=3, max_segs=100):
+    """
+    使圆弧与弦之间的最大距离不超过chord_error(世界单位)所需的最少分段数
+    每段的弦高为 radius * (1 - cos(pi / segs))
+    """
+    if radius <= 0 or chord_error <= 0:
+        return max_segs
+    if chord_error >= radius:
+        return min_segs
+    segs = math.ceil(math.pi / math.acos(1 - chord_error / radius))
+    return int(max(min_segs, min(segs, max_segs)))
+
+
 def circle(bm, radius=1, segs=10, cap_tris=False):
     ret = bmesh.ops.create_circle(
         bm, cap_ends=True, cap_tris=cap_tris, segment=segs, diameter=radius * 2
@@ -30,6 +44,19 @@ def circle(bm, radius=1, segs=10, cap_tris=False):
     return ret
 
 
+def mesh_from_coords(bm, coords, faces):
+    """
+    由顶点坐标和面的顶点序号一次性生成几何
+    :param coords: (list)顶点坐标(x, y, z)
+    :param faces: (list)每个面的顶点序号
+    """
+    verts = [bm.verts.new(co) for co in coords]
+    return {
+        'verts': verts,
+        'faces': [bm.faces.new([verts[i] for i in f]) for f in faces]
+    }
+
+
 def cone(bm, r1=.5, r2=.01, height=2, segs=32):
     ret = bmesh.ops.create_cone(
         bm, diameter1=r1 * 2, diameter2=r2 * 2, depth=height,
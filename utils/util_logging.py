@@ -1,6 +1,101 @@
+import time
 import logging
 
 
+# 分阶段计时记录的接收者, 为None时计时关闭
+_sink = None
+
+
+class ProfileRecorder:
+    """默认的计时记录接收者, 保存所有记录并可按阶段汇总"""
+
+    def __init__(self):
+        self.records = []
+
+    def __call__(self, record):
+        self.records.append(record)
+
+    def clear(self):
+        self.records = []
+
+    def summary(self):
+        """按(logger, stage)汇总调用次数和总耗时"""
+        result = {}
+        for rec in self.records:
+            key = (rec['logger'], rec['stage'])
+            item = result.setdefault(key, {'calls': 0, 'seconds': 0.0})
+            item['calls'] += 1
+            item['seconds'] += rec['seconds']
+        return result
+
+
+def enable_profiling(sink=None):
+    """
+    开启分阶段计时
+    :param sink: (callable)接收每条记录(dict)的函数，默认使用ProfileRecorder
+    :return: 当前使用的sink
+    """
+    global _sink
+    _sink = sink if sink is not None else ProfileRecorder()
+    return _sink
+
+
+def disable_profiling():
+    global _sink
+    _sink = None
+
+
+def profiling_enabled():
+    return _sink is not None
+
+
+class _NullStage:
+    """计时关闭时使用的空阶段"""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def count(self, **counts):
+        pass
+
+
+_null_stage = _NullStage()
+
+
+class _Stage:
+    """记录一个阶段的耗时和元素数量"""
+
+    def __init__(self, logger, name, bm, counts):
+        self.logger = logger
+        self.name = name
+        self.bm = bm
+        self.counts = counts
+
+    def __enter__(self):
+        if self.bm is not None:
+            self.verts, self.faces = len(self.bm.verts), len(self.bm.faces)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        seconds = time.perf_counter() - self.start
+        record = {'logger': self.logger, 'stage': self.name, 'seconds': seconds}
+        if self.bm is not None:
+            record['new_verts'] = len(self.bm.verts) - self.verts
+            record['new_faces'] = len(self.bm.faces) - self.faces
+        record.update(self.counts)
+        if _sink is not None:
+            _sink(record)
+        return False
+
+    def count(self, **counts):
+        """补充记录元素数量"""
+        self.counts.update(counts)
+
+
 class Logger:
 
     def __init__(self, name, level=logging.INFO):
@@ -9,3 +104,12 @@ class Logger:
 
     def info(self, text):
         self.logger.info(text)
+
+    def stage(self, name, bm=None, **counts):
+        """
+        分阶段计时: with logger.stage('split', bm, faces=1): ...
+        计时关闭时返回空阶段，不产生额外开销
+        """
+        if _sink is None:
+            return _null_stage
+        return _Stage(self.logger.name, name, bm, counts)
@@ -1,17 +1,62 @@
 import bpy
 import bmesh
 import operator
+import numpy as np
 import functools as ft
+from contextlib import contextmanager
 from mathutils import Matrix, Vector
+from bpy.app.handlers import persistent
 from bmesh.types import BMVert
+from .util_logging import Logger
+
+_logger = Logger(__name__)
 
 
 # verts-顶点, edges-边, faces-面
 # 对网格进行操作
 
+# 多个物体共用的网格上记录其内容键的自定义属性, 见Floorplan.build
+SHARED_MESH_TAG = 'cynthia_shared_key'
+
+
 def get_edit_mesh():
-    """获取编辑模式下的物体网格数据"""
-    return bpy.context.edit_object.data
+    """
+    获取编辑模式下的物体网格数据
+    共用的网格在修改前先让当前物体独占(copy-on-write)，其它物体不受影响
+    通常进入编辑模式时unshare_edit_mesh已经处理过, 这里不切换模式, 可在operator的execute中调用
+    """
+    obj = bpy.context.edit_object
+    if SHARED_MESH_TAG in obj.data:
+        make_single_user_mesh(obj)
+    return obj.data
+
+
+def make_single_user_mesh(obj):
+    """
+    让物体独占其网格, 网格不再参与共享; 其它使用者改用一份复制的网格
+    不切换模式: 编辑模式中的修改在退出编辑模式前不会写入网格, 复制的是进入编辑模式前的内容
+    """
+    me = obj.data
+    if me.users > 1:
+        others = [o for o in bpy.data.objects if o.data == me and o != obj]
+        if others:
+            copy = me.copy()
+            for o in others:
+                o.data = copy
+    if SHARED_MESH_TAG in me:
+        del me[SHARED_MESH_TAG]
+    return me
+
+
+@persistent
+def unshare_edit_mesh(scene):
+    """
+    scene_update_post处理函数: 物体进入编辑模式时, 若其网格与其它物体共用, 先让它独占网格,
+    编辑只影响这一个物体
+    """
+    obj = bpy.context.edit_object
+    if obj is not None and obj.type == 'MESH' and SHARED_MESH_TAG in obj.data:
+        make_single_user_mesh(obj)
 
 
 def make_mesh(name):
@@ -30,39 +75,51 @@ def filter_geom(geom, _type):
     return list(filter(lambda x: isinstance(x, _type), geom))
 
 
-def filter_vertical_edges(edges, normal):
+def _round_coords(co, ndigits=3):
     """
-    round()方法--返回浮点数x的四舍五入值
-    res--对垂直方向的边进行值精确化，返回为边的数组
+    批量四舍五入，结果与内置round()一致
+    np.round在恰好处于进位边界(如x.xxx5)的值上可能与round()不同，这些值单独用round()处理
     """
-    res = []
-    rnd = lambda val: round(val, 3)
+    res = np.round(co, ndigits)
+    scaled = np.abs(co) * 10 ** ndigits
+    tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if tie.any():
+        res[tie] = [round(float(val), ndigits) for val in co[tie]]
+    return res
 
-    for e in edges:
-        if normal.x:
-            s = set([rnd(v.co.y) for v in e.verts])
-        else:
-            s = set([rnd(v.co.x) for v in e.verts])
 
-        if len(s) == 1:
-            res.append(e)
-    return res
+def edge_orientation_masks(edges, normal):
+    """
+    一次性读取所有边的顶点坐标，批量判断边的方向
+    返回(vertical, horizontal)两个布尔数组，精度为小数点后3位
+    """
+    edges = list(edges)
+    if not edges:
+        return np.zeros(0, dtype=bool), np.zeros(0, dtype=bool)
 
+    co = np.array([v.co[:] for e in edges for v in e.verts], dtype=np.float64)
+    co = _round_coords(co).reshape(-1, 2, 3)
+    same = co[:, 0, :] == co[:, 1, :]
 
-def filter_horizontal_edges(edges, normal):
-    """处理水平方向的边"""
-    res = []
-    rnd = lambda val: round(val, 3)
+    vertical = same[:, 1] if normal.x else same[:, 0]
+    horizontal = same[:, 1] if normal.z else same[:, 2]
+    return vertical, horizontal
 
-    for e in edges:
-        if normal.z:
-            s = set([rnd(v.co.y) for v in e.verts])
-        else:
-            s = set([rnd(v.co.z) for v in e.verts])
 
-        if len(s) == 1:
-            res.append(e)
-    return res
+def filter_vertical_edges(edges, normal):
+    """
+    筛选垂直方向的边(坐标精确到小数点后3位)，返回为边的数组
+    """
+    edges = list(edges)
+    vertical, _ = edge_orientation_masks(edges, normal)
+    return [e for e, keep in zip(edges, vertical) if keep]
+
+
+def filter_horizontal_edges(edges, normal):
+    """处理水平方向的边"""
+    edges = list(edges)
+    _, horizontal = edge_orientation_masks(edges, normal)
+    return [e for e, keep in zip(edges, horizontal) if keep]
 
 
 def calc_edge_median(edge):
@@ -78,17 +135,187 @@ def calc_verts_median(verts):
 
 def calc_face_dimensions(face):
     """计算面的长和宽"""
-    vertical = filter_vertical_edges(face.edges, face.normal)[-1]
-    horizontal = filter_horizontal_edges(face.edges, face.normal)[-1]
+    edges = list(face.edges)
+    v_mask, h_mask = edge_orientation_masks(edges, face.normal)
+    vertical = [e for e, keep in zip(edges, v_mask) if keep][-1]
+    horizontal = [e for e, keep in zip(edges, h_mask) if keep][-1]
     return horizontal.calc_length(), vertical.calc_length()
 
 
+class ChangeSet:
+    """记录一次建造过程中各步骤新建或改动过的顶点和面"""
+
+    def __init__(self, bm, geom=()):
+        self.bm = bm
+        self.verts = set()
+        self.faces = set()
+        self.unwelded = set()
+        self.normals_dirty = False
+        # 操作的输入元素(面/边/顶点)的顶点, 新建的几何与网格原有部分只可能在这附近重合
+        self.inputs = {v for ele in geom for v in ([ele] if isinstance(ele, BMVert) else ele.verts)}
+
+    def touch(self, verts):
+        """登记新建或移动过的顶点"""
+        verts = list(verts)
+        self.verts.update(verts)
+        self.unwelded.update(verts)
+
+    def touch_faces(self, faces):
+        """登记新建或改动过的面"""
+        self.faces.update(faces)
+
+    def weld_scope(self, dist):
+        """
+        需要合并的顶点: 上次合并后登记的顶点、输入元素和登记的面的顶点, 以及它们的一圈相邻顶点
+        每次合并时重新收集, 范围只与改动的大小有关, 与网格大小无关
+        """
+        verts = {v for v in self.unwelded if v.is_valid}
+        if not verts:
+            return []
+        verts.update(v for v in self.inputs if v.is_valid)
+        verts.update(v for f in self.faces if f.is_valid for v in f.verts)
+        near = {ov for v in verts for f in v.link_faces for ov in f.verts}
+        near.update(ov for v in verts for e in v.link_edges for ov in e.verts)
+        return list(verts | near)
+
+    def welded(self, verts):
+        """合并之后: 登记的顶点可能已被合并掉, 保留下来的顶点代替它们参与法线计算"""
+        self.verts.update(v for v in verts if v.is_valid)
+        self.unwelded.clear()
+
+    def dirty_region(self):
+        """
+        需要重新计算法线的面: 改动过的面、改动顶点的邻接面(core)以及与它们共边的一圈面(ring)
+        ring中的面没有改动, 其法线作为朝向的参照
+        """
+        core = {f for f in self.faces if f.is_valid}
+        core.update(f for v in self.verts if v.is_valid for f in v.link_faces)
+        ring = {lf for f in core for e in f.edges for lf in e.link_faces} - core
+        return core, ring
+
+    def recalc_normals(self):
+        """
+        只对改动区域重新计算法线
+        区域单独计算时整体朝向可能与网格其余部分相反, 以ring中原有的法线为准, 多数被翻转的连通块整体翻回
+        """
+        core, ring = self.dirty_region()
+        faces = core | ring
+        if not faces:
+            return
+        for f in ring:
+            f.normal_update()
+        before = {f: f.normal.copy() for f in ring}
+
+        with _logger.stage('recalc_normals', self.bm, faces=len(faces)):
+            bmesh.ops.recalc_face_normals(self.bm, faces=list(faces))
+            flip = []
+            for island in _face_islands(faces):
+                anchors = [f for f in island if f in before]
+                flipped = sum(1 for f in anchors if f.normal.dot(before[f]) < 0)
+                if flipped * 2 > len(anchors):
+                    flip.extend(island)
+            if flip:
+                bmesh.ops.reverse_faces(self.bm, faces=flip)
+
+        self.verts.clear()
+        self.faces.clear()
+        self.normals_dirty = False
+
+
+def _face_islands(faces):
+    """faces中经由共边相连的各个连通块"""
+    faces = set(faces)
+    islands = []
+    while faces:
+        stack = [faces.pop()]
+        island = []
+        while stack:
+            face = stack.pop()
+            island.append(face)
+            for e in face.edges:
+                for lf in e.link_faces:
+                    if lf in faces:
+                        faces.remove(lf)
+                        stack.append(lf)
+        islands.append(island)
+    return islands
+
+
+# 当前正在记录的改动 {id(bm): ChangeSet}
+_change_sets = {}
+
+
+@contextmanager
+def track_changes(bm, geom=()):
+    """
+    在一次建造过程中记录bm上改动过的顶点和面
+    建造过程中请求的法线计算推迟到结束时对改动区域统一进行一次
+    :param geom: 操作的输入元素(面/边/顶点), 合并重复顶点时只在改动和输入附近查找(见ChangeSet.weld_scope)
+    """
+    changes = ChangeSet(bm, geom)
+    _change_sets[id(bm)] = changes
+    try:
+        yield changes
+        if changes.normals_dirty:
+            changes.recalc_normals()
+    finally:
+        _change_sets.pop(id(bm), None)
+
+
+def touch_verts(bm, verts):
+    """将新建或移动过的顶点登记到bm的改动记录(如有)"""
+    changes = _change_sets.get(id(bm))
+    if changes is not None:
+        changes.touch(verts)
+
+
+def weld_verts(bm, dist=0.0001):
+    """
+    合并重复顶点
+    有改动记录时只处理改动过的顶点、输入元素及它们的相邻顶点，否则处理整个网格
+    """
+    changes = _change_sets.get(id(bm))
+    verts = list(bm.verts) if changes is None else changes.weld_scope(dist)
+    if verts:
+        with _logger.stage('remove_doubles', bm, verts=len(verts)):
+            bmesh.ops.remove_doubles(bm, verts=verts, dist=dist)
+    if changes is not None:
+        changes.welded(verts)
+
+
+def touch_faces(bm, faces):
+    """将新建或改动过的面登记到bm的改动记录(如有)"""
+    changes = _change_sets.get(id(bm))
+    if changes is not None:
+        changes.touch_faces(faces)
+
+
+def recalc_normals(bm):
+    """
+    重新计算面的法线
+    有改动记录时推迟到这次建造结束, 只计算改动区域(见ChangeSet.recalc_normals)，否则立即处理整个网格
+    """
+    changes = _change_sets.get(id(bm))
+    if changes is not None:
+        changes.normals_dirty = True
+        return
+    with _logger.stage('recalc_normals', bm, faces=len(bm.faces)):
+        bmesh.ops.recalc_face_normals(bm, faces=list(bm.faces))
+
+
+def _linked_face_with_verts(verts):
+    """在给定顶点的邻接面中寻找顶点全部属于verts的面"""
+    for v in verts:
+        for face in v.link_faces:
+            if all(fv in verts for fv in face.verts):
+                return face
+    return None
+
+
 def face_with_verts(bm, verts, default=None):
-    """利用给定的顶点寻找对应的面"""
-    for face in bm.faces:
-        if len(set(list(face.verts) + verts)) == len(verts):
-            return face
-    return default
+    """利用给定的顶点寻找对应的面, 只在这些顶点的邻接面中查找, 与网格大小无关"""
+    face = _linked_face_with_verts(set(verts))
+    return default if face is None else face
 
 
 def split_quad(bm, face, vertical=False, cuts=4):
@@ -126,10 +353,11 @@ def split(bm, face, svertical, shorizontal, offx=0, offy=0, offz=0):
 
         T = Matrix.Translation(-median)
         bmesh.ops.scale(bm, vec=(shorizontal, shorizontal, 1), verts=verts, space=T)
+        touch_verts(bm, verts)
 
     # 垂直方向分割 -- 边上的顶点具有相同的x/y坐标
     if do_vertical:
-        bmesh.ops.remove_doubles(bm, verts=list(bm.verts))
+        weld_verts(bm)
         face = face_with_verts(bm, verts) if do_horizontal else face
 
         # 判断垂直的边
@@ -146,11 +374,13 @@ def split(bm, face, svertical, shorizontal, offx=0, offy=0, offz=0):
         # 计算切分的面
         T = Matrix.Translation(-median)
         bmesh.ops.scale(bm, vec=(1, 1, svertical), verts=verts, space=T)
+        touch_verts(bm, verts)
 
     if do_horizontal and do_vertical:
         link_edges = [e for v in verts for e in v.link_edges]
         all_verts = list({v for e in link_edges for v in e.verts})
         bmesh.ops.translate(bm, verts=all_verts, vec=(offx, offy, 0))
+        touch_verts(bm, all_verts)
     elif do_horizontal and not do_vertical:
         bmesh.ops.translate(bm, verts=verts, vec=(offx, offy, 0))
 
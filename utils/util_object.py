@@ -22,6 +22,32 @@ def bm_to_obj(bm, obj):
     bm.free()
 
 
+def bm_append(bm, src, matrix=None):
+    """
+    将src中的几何复制到bm中(可选变换矩阵), 不经过网格数据块
+    :return: (list)新建的顶点, 与src.verts顺序一致
+    """
+    verts = [bm.verts.new(v.co if matrix is None else matrix * v.co) for v in src.verts]
+    src.verts.index_update()
+    for e in src.edges:
+        if not e.link_faces:
+            bm.edges.new([verts[v.index] for v in e.verts])
+    for f in src.faces:
+        bm.faces.new([verts[v.index] for v in f.verts])
+    return verts
+
+
+def link_objs(objs):
+    """将多个物体一次链接到场景, 只做一次选择状态的更新"""
+    scene = bpy.context.scene
+    select(bpy.data.objects, False)
+    for obj in objs:
+        scene.objects.link(obj)
+        obj.select = True
+    if objs:
+        scene.objects.active = objs[-1]
+
+
 def link_obj(obj):
     """将物体链接到场景"""
     bpy.context.scene.objects.link(obj)
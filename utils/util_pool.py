@@ -0,0 +1,57 @@
+import os
+import sys
+import importlib
+import itertools as it
+import concurrent.futures
+from collections import deque
+
+# 在进程池中分组执行纯Python的计算, 本模块以及被执行的函数所在的模块都不能依赖bpy
+# 只用于Blender之外的脚本(如benchmarks): Blender中sys.executable是blender本身, 无法启动工作进程
+
+
+def standalone(func):
+    """
+    以顶层模块名重新导入func所在的模块, 返回其中的同名函数
+    工作进程按模块名反序列化函数, 包内的模块名会先导入插件包的__init__(其中导入了bpy);
+    顶层模块名只需要该模块所在的目录在sys.path中(spawn时子进程沿用父进程的sys.path)
+    """
+    module = sys.modules[func.__module__]
+    path, name = os.path.split(os.path.splitext(os.path.abspath(module.__file__))[0])
+    if path not in sys.path:
+        sys.path.append(path)
+    return getattr(importlib.import_module(name), func.__name__)
+
+
+def map_chunks(func, items, workers=None, chunksize=32, executor=None):
+    """
+    在进程池中以func处理items, 按输入顺序逐个返回结果
+    :param func: 处理一组输入并返回结果列表的函数, 其模块不能有包内的相对导入(见standalone)
+    :param items: (iterable)按chunksize分组惰性读取, 每个工作进程最多同时处理两组
+    :param workers: (int)进程数, 默认为cpu数量; 为1时在当前进程中执行
+    :param executor: 可传入已有的concurrent.futures执行器以复用进程池
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = iter(lambda it_=iter(items): list(it.islice(it_, chunksize)), [])
+    if executor is None and workers == 1:
+        for chunk in chunks:
+            for result in func(chunk):
+                yield result
+        return
+
+    func = standalone(func)
+    pool = executor or concurrent.futures.ProcessPoolExecutor(workers)
+    pending = deque()
+    try:
+        for chunk in chunks:
+            pending.append(pool.submit(func, chunk))
+            if len(pending) >= 2 * workers:
+                for result in pending.popleft().result():
+                    yield result
+        while pending:
+            for result in pending.popleft().result():
+                yield result
+    finally:
+        for future in pending:
+            future.cancel()
+        if executor is None:
+            pool.shutdown()
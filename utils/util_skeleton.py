@@ -1,10 +1,12 @@
 # Adapted from https://github.com/yonghah/polyskel
 
+import os
+import sys
 import math
 import operator
 import heapq
 import itertools as it
-from collections import namedtuple
+from collections import namedtuple, OrderedDict
 
 try:
     long
@@ -461,6 +463,11 @@ class LineSegment2(Line2):
 '''
 
 
+# how far (sine of the angle) a split point may lie outside a bisector of the opposite edge's vertices
+# and still be taken as on it, see _LAVertex._split_event
+_ON_BISECTOR = 1e-9
+
+
 def _window(lst):
     prevs, items, nexts = it.tee(lst, 3)
     prevs = it.islice(it.cycle(prevs), len(lst)-1, None)
@@ -481,6 +488,49 @@ def _approximately_same(point_a, point_b):
     return _approximately_equals(point_a.x, point_b.x) and _approximately_equals(point_a.y, point_b.y)
 
 
+def _unit(x, y):
+    """(x, y) normalized, computed as Vector2.normalized does"""
+    d = math.sqrt(x ** 2 + y ** 2)
+    if d:
+        return x / d, y / d
+    return x, y
+
+
+def _distance(ax, ay, bx, by):
+    return math.sqrt((bx - ax) ** 2 + (by - ay) ** 2)
+
+
+def _line_intersection(ax, ay, avx, avy, bx, by, bvx, bvy, ray_a=False, ray_b=False):
+    """
+    Intersection (x, y) of line a through (ax, ay) along (avx, avy) and line b, or None,
+    computed as _intersect_line2_line2 does. ray_a / ray_b restrict a line to its positive half.
+    """
+    d = bvy * avx - bvx * avy
+    if d == 0:
+        return None
+
+    dy = ay - by
+    dx = ax - bx
+    ua = (bvx * dy - bvy * dx) / d
+    if ray_a and not ua >= 0.0:
+        return None
+    if ray_b and not (avx * dy - avy * dx) / d >= 0.0:
+        return None
+
+    return (ax + ua * avx, ay + ua * avy)
+
+
+def _line_distance(px, py, lx, ly, lvx, lvy):
+    """Distance of point (px, py) to the line through (lx, ly) along (lvx, lvy)"""
+    u = ((px - lx) * lvx + (py - ly) * lvy) / (lvx ** 2 + lvy ** 2)
+    return _distance(px, py, lx + u * lvx, ly + u * lvy)
+
+
+def _edge_key(edge, direction=None):
+    """Hashable key of an edge by its start point and direction (its normalized vector, if known)"""
+    return (edge.p.x, edge.p.y) + (direction or _unit(edge.v.x, edge.v.y))
+
+
 def _normalize_contour(contour):
     contour = [Point2(float(x), float(y)) for (x,y) in contour]
     return [point for prev, point, next in _window(contour) if not (point==next or (point-prev).normalized() == (next-point).normalized())]
@@ -499,7 +549,20 @@ class _EdgeEvent(namedtuple("_EdgeEvent", "distance intersection_point vertex_a
     def __str__(self):
         return "{} Edge event @ {} between {} and {}".format(self.distance, self.intersection_point, self.vertex_a, self.vertex_b)
 
-_OriginalEdge = namedtuple("_OriginalEdge", "edge bisector_left, bisector_right")
+class _OriginalEdge(namedtuple("_OriginalEdge", "edge bisector_left, bisector_right, coords")):
+    """
+    An edge of the input polygon with the bisectors of its two vertices.
+    coords holds their geometry as plain floats for _LAVertex._split_event:
+    edge point, vector and direction, then point and direction of the left and right bisector.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def create(cls, edge, bisector_left, bisector_right):
+        return cls(edge, bisector_left, bisector_right,
+                   (edge.p.x, edge.p.y, edge.v.x, edge.v.y) + _unit(edge.v.x, edge.v.y) +
+                   (bisector_left.p.x, bisector_left.p.y) + _unit(bisector_left.v.x, bisector_left.v.y) +
+                   (bisector_right.p.x, bisector_right.p.y) + _unit(bisector_right.v.x, bisector_right.v.y))
 
 Subtree = namedtuple("Subtree", "source, height, sinks")
 
@@ -510,6 +573,9 @@ def _side(point, line):
 
 
 class _LAVertex:
+    __slots__ = ['point', 'edge_left', 'edge_right', 'prev', 'next', 'lav', '_valid', '_is_reflex', '_bisector',
+                 '_co', '_dir_left', '_dir_right', '_bisector_v', '_bisector_dir']
+
     def __init__(self, point, edge_left, edge_right, direction_vectors=None):
         self.point = point
         self.edge_left = edge_left
@@ -519,15 +585,29 @@ class _LAVertex:
         self.lav = None
         self._valid = True; # this should be handled better. Maybe membership in lav implies validity?
 
-        creator_vectors = (edge_left.v.normalized()*-1, edge_right.v.normalized())
-        if direction_vectors is None:
-            direction_vectors = creator_vectors
-
-        self._is_reflex = (_cross(*direction_vectors)) < 0
-        self._bisector = Ray2(self.point, operator.add(*creator_vectors) * (-1 if self.is_reflex else 1))
+        # plain float copies of the geometry, the event maths below runs on these
+        self._co = (point.x, point.y)
+        self._dir_left = _unit(edge_left.v.x, edge_left.v.y)
+        self._dir_right = _unit(edge_right.v.x, edge_right.v.y)
+
+        lx, ly = self._dir_left
+        creator_vectors = ((lx * -1, ly * -1), self._dir_right)
+        (ax, ay), (bx, by) = creator_vectors if direction_vectors is None else direction_vectors
+
+        self._is_reflex = (ax*by - bx*ay) < 0
+        sign = -1 if self._is_reflex else 1
+        (ax, ay), (bx, by) = creator_vectors
+        self._bisector_v = ((ax + bx) * sign, (ay + by) * sign)
+        if abs(self._bisector_v[0]) + abs(self._bisector_v[1]) < _ON_BISECTOR:
+            # collinear edges, left behind by a vertex event: the vertex moves with them, square to both
+            self._bisector_v = (by, -bx)
+        self._bisector_dir = _unit(*self._bisector_v)
+        self._bisector = None
 
     @property
     def bisector(self):
+        if self._bisector is None:
+            self._bisector = Ray2(self.point, Vector2(*self._bisector_v))
         return self._bisector
 
     @property
@@ -538,64 +618,105 @@ class _LAVertex:
     def original_edges(self):
         return self.lav._slav._original_edges
 
-    def next_event(self):
-        events = []
-        if self.is_reflex:
-            # a reflex vertex may generate a split event
-            # split events happen when a vertex hits an opposite edge, splitting the polygon in two.
-            for edge in self.original_edges:
-                if edge.edge == self.edge_left or edge.edge == self.edge_right:
-                    continue
+    def _split_event(self, edge):
+        """Split event of this (reflex) vertex against an original edge, or None"""
+        if edge.edge == self.edge_left or edge.edge == self.edge_right:
+            return None
+        epx, epy, evx, evy, eux, euy, blx, bly, blux, bluy, brx, bry, brux, bruy = edge.coords
+
+        # a potential b is at the intersection of between our own bisector and the bisector of the
+        # angle between the tested edge and any one of our own edges.
+
+        # we choose the "less parallel" edge (in order to exclude a potentially parallel edge)
+        leftdot = abs(self._dir_left[0] * eux + self._dir_left[1] * euy)
+        rightdot = abs(self._dir_right[0] * eux + self._dir_right[1] * euy)
+        selfedge = self.edge_left if leftdot < rightdot else self.edge_right
 
-                # a potential b is at the intersection of between our own bisector and the bisector of the
-                # angle between the tested edge and any one of our own edges.
+        i = _line_intersection(epx, epy, evx, evy, selfedge.p.x, selfedge.p.y, selfedge.v.x, selfedge.v.y)
+        if i is None:
+            return None
+        x, y = self._co
+        ix, iy = i
+        if (ix == x and iy == y) or math.sqrt((ix - x) ** 2 + (iy - y) ** 2) <= \
+                max(math.sqrt(ix ** 2 + iy ** 2), math.sqrt(x ** 2 + y ** 2)) * 0.001:
+            return None
 
-                # we choose the "less parallel" edge (in order to exclude a potentially parallel edge)
-                leftdot = abs(self.edge_left.v.normalized().dot(edge.edge.v.normalized()))
-                rightdot = abs(self.edge_right.v.normalized().dot(edge.edge.v.normalized()))
-                selfedge = self.edge_left if leftdot < rightdot else self.edge_right
-                otheredge = self.edge_left if leftdot > rightdot else self.edge_right
+        # locate candidate b
+        linx, liny = _unit(x - ix, y - iy)
+        edx, edy = eux, euy
+        if linx * edx + liny * edy < 0:
+            edx, edy = -edx, -edy
 
-                i = Line2(selfedge).intersect(Line2(edge.edge))
-                if i is not None and not _approximately_equals(i, self.point):
-                    # locate candidate b
-                    linvec = (self.point - i).normalized()
-                    edvec = edge.edge.v.normalized()
-                    if linvec.dot(edvec)<0:
-                        edvec = -edvec
+        bisx, bisy = edx + linx, edy + liny
+        if math.sqrt(bisx ** 2 + bisy ** 2) == 0:
+            return None
+        b = _line_intersection(x, y, self._bisector_v[0], self._bisector_v[1], ix, iy, bisx, bisy, ray_a=True)
 
-                    bisecvec = edvec + linvec
-                    if abs(bisecvec) == 0:
-                        continue
-                    bisector = Line2(i, bisecvec)
-                    b = bisector.intersect(self.bisector)
+        if b is None:
+            return None
 
-                    if b is None:
-                        continue
+        # check eligibility of b
+        # a valid b should lie within the area limited by the edge and the bisectors of its two vertices,
+        # on a bisector it meets that vertex head on (see _SLAV.handle_split_event):
+        bx, by = b
+        dx, dy = _unit(bx - blx, by - bly)
+        if not blux * dy - dx * bluy > -_ON_BISECTOR:
+            return None
+        dx, dy = _unit(bx - brx, by - bry)
+        if not brux * dy - dx * bruy < _ON_BISECTOR:
+            return None
+        dx, dy = _unit(bx - epx, by - epy)
+        if not eux * dy - dx * euy < 0:
+            return None
 
-                    # check eligibility of b
-                    # a valid b should lie within the area limited by the edge and the bisectors of its two vertices:
-                    xleft = _cross(edge.bisector_left.v.normalized(), (b - edge.bisector_left.p).normalized())  > 0
-                    xright = _cross(edge.bisector_right.v.normalized(), (b - edge.bisector_right.p).normalized())  <  0
-                    xedge = _cross(edge.edge.v.normalized(), (b - edge.edge.p).normalized()) < 0
+        return _SplitEvent(_line_distance(bx, by, epx, epy, evx, evy), Point2(bx, by), self, edge.edge)
 
-                    if not (xleft and xright and xedge):
-                        continue
+    def next_event(self):
+        events = []
+        x, y = self._co
+        bvx, bvy = self._bisector_v
+        prev, next = self.prev, self.next
+        i_prev = _line_intersection(prev._co[0], prev._co[1], prev._bisector_v[0], prev._bisector_v[1],
+                                    x, y, bvx, bvy, ray_a=True, ray_b=True)
+        i_next = _line_intersection(next._co[0], next._co[1], next._bisector_v[0], next._bisector_v[1],
+                                    x, y, bvx, bvy, ray_a=True, ray_b=True)
 
-                    events.append( _SplitEvent(Line2(edge.edge).distance(b), b, self, edge.edge) )
+        if self.is_reflex:
+            # a reflex vertex may generate a split event
+            # split events happen when a vertex hits an opposite edge, splitting the polygon in two.
 
-        i_prev = self.bisector.intersect(self.prev.bisector)
-        i_next = self.bisector.intersect(self.next.bisector)
+            # the nearest edge event bounds how far along our bisector a split event can still win,
+            # so only edges whose split region meets that stretch of the bisector need to be tested
+            bound = [_distance(x, y, i[0], i[1]) for i in (i_prev, i_next) if i is not None]
+            candidates, exhaustive = self.lav._slav.split_candidates(self, min(bound) if bound else None)
+            for edge in candidates:
+                event = self._split_event(edge)
+                if event is not None:
+                    events.append(event)
+
+            if not events and not exhaustive:
+                # nothing found before the bisector left the polygon bounds,
+                # test the edges whose split region reaches beyond them
+                tested = set(map(id, candidates))
+                for edge in self.lav._slav.split_candidates_beyond(self, min(bound) if bound else None):
+                    if id(edge) not in tested:
+                        event = self._split_event(edge)
+                        if event is not None:
+                            events.append(event)
 
         if i_prev is not None:
-            events.append(_EdgeEvent(Line2(self.edge_left).distance(i_prev), i_prev, self.prev, self))
+            el = self.edge_left
+            events.append(_EdgeEvent(_line_distance(i_prev[0], i_prev[1], el.p.x, el.p.y, el.v.x, el.v.y),
+                                     Point2(*i_prev), self.prev, self))
         if i_next is not None:
-            events.append(_EdgeEvent(Line2(self.edge_right).distance(i_next), i_next, self, self.next))
+            er = self.edge_right
+            events.append(_EdgeEvent(_line_distance(i_next[0], i_next[1], er.p.x, er.p.y, er.v.x, er.v.y),
+                                     Point2(*i_next), self, self.next))
 
         if not events:
             return None
 
-        ev = min(events, key=lambda event: self.point.distance(event.intersection_point))
+        ev = min(events, key=lambda event: _distance(x, y, event.intersection_point.x, event.intersection_point.y))
 
         return ev
 
@@ -621,16 +742,247 @@ class _LAVertex:
             "reflex" if self.is_reflex else "convex", self.point.x, self.point.y, self.bisector, self.edge_left, self.edge_right)
 
 
+def _clip_halfplane(poly, px, py, vx, vy, sign, tol):
+    """Clip convex polygon (list of (x, y)) to the half-plane sign * cross(v, q - p) >= -tol"""
+    out = []
+    n = len(poly)
+    for k in range(n):
+        ax, ay = poly[k]
+        bx, by = poly[(k + 1) % n]
+        fa = sign * (vx * (ay - py) - vy * (ax - px))
+        fb = sign * (vx * (by - py) - vy * (bx - px))
+        if fa >= -tol:
+            out.append((ax, ay))
+        if (fa >= -tol) != (fb >= -tol):
+            t = fa / (fa - fb)
+            out.append((ax + t * (bx - ax), ay + t * (by - ay)))
+    return out
+
+
+def _segment_hits_box(x0, y0, x1, y1, bx0, by0, bx1, by1):
+    """Liang-Barsky test of segment (x0, y0)-(x1, y1) against an axis aligned box"""
+    t0, t1 = 0.0, 1.0
+    dx, dy = x1 - x0, y1 - y0
+    for p, q in ((-dx, x0 - bx0), (dx, bx1 - x0), (-dy, y0 - by0), (dy, by1 - y0)):
+        if p == 0:
+            if q < 0:
+                return False
+        else:
+            t = q / p
+            if p < 0:
+                if t > t1:
+                    return False
+                t0 = max(t0, t)
+            else:
+                if t < t0:
+                    return False
+                t1 = min(t1, t)
+    return True
+
+
+class _EdgeGrid:
+    """
+    Uniform grid over the polygon bounds, holding for each cell the original edges whose split region
+    (the area between the edge and the bisectors of its two vertices) overlaps that cell.
+    A split event on an edge can only lie inside that region, so a query along a vertex bisector
+    only has to test the edges registered in the cells the bisector passes through.
+    """
+
+    def __init__(self, original_edges, points):
+        self.edges = original_edges
+        pts = [(p.x, p.y) for p in points]
+        xs = [p[0] for p in pts] or [0.0]
+        ys = [p[1] for p in pts] or [0.0]
+        size = max(max(xs) - min(xs), max(ys) - min(ys), 1e-9)
+        self.tol = size * 1e-7
+        self.x0, self.y0 = min(xs) - self.tol, min(ys) - self.tol
+        self.x1, self.y1 = max(xs) + self.tol, max(ys) + self.tol
+
+        self.res = max(1, int(math.sqrt(len(original_edges))))
+        self.cw = (self.x1 - self.x0) / self.res
+        self.ch = (self.y1 - self.y0) / self.res
+        self.cells = {}
+
+        # edges whose split region reaches the bounds, with the half-planes bounding that region
+        self.open_edges = []
+
+        box = [(self.x0, self.y0), (self.x1, self.y0), (self.x1, self.y1), (self.x0, self.y1)]
+        for idx, edge in enumerate(original_edges):
+            planes = tuple((line.p.x, line.p.y, line.v.x, line.v.y, sign) for line, sign in
+                           ((edge.edge, -1), (edge.bisector_left, 1), (edge.bisector_right, -1)))
+            region = box
+            for plane in planes:
+                region = _clip_halfplane(region, *plane, tol=self.tol)
+            if not region:
+                continue
+
+            if any(not (self.x0 + self.tol < x < self.x1 - self.tol and
+                        self.y0 + self.tol < y < self.y1 - self.tol) for x, y in region):
+                self.open_edges.append((edge, planes))
+
+            ci0, cj0 = self._cell(min(q[0] for q in region), min(q[1] for q in region))
+            ci1, cj1 = self._cell(max(q[0] for q in region), max(q[1] for q in region))
+            for ci in range(ci0, ci1 + 1):
+                for cj in range(cj0, cj1 + 1):
+                    self.cells.setdefault((ci, cj), []).append(idx)
+
+    def _cell(self, x, y):
+        ci = int((x - self.x0) / self.cw) if self.cw else 0
+        cj = int((y - self.y0) / self.ch) if self.ch else 0
+        return min(max(ci, 0), self.res - 1), min(max(cj, 0), self.res - 1)
+
+    def _inside(self, x, y):
+        return self.x0 <= x <= self.x1 and self.y0 <= y <= self.y1
+
+    def candidates(self, point, direction, length=None):
+        """
+        Original edges, in their original order, whose split region meets the segment from point
+        along direction with the given length (None for unbounded).
+
+        The segment is clipped to the polygon bounds; the second return value is False when that
+        cut it short, in which case edges reached only beyond the bounds are not included.
+        Any split event found among the returned edges is nearer than those would be.
+        """
+        x0, y0 = point.x, point.y
+        d = abs(direction)
+        if not d or not self._inside(x0, y0):
+            return self.edges, True
+        dx, dy = direction.x / d, direction.y / d
+
+        # distance along the ray to the bounds
+        exit_length = float('inf')
+        if dx > 0:
+            exit_length = min(exit_length, (self.x1 - x0) / dx)
+        elif dx < 0:
+            exit_length = min(exit_length, (self.x0 - x0) / dx)
+        if dy > 0:
+            exit_length = min(exit_length, (self.y1 - y0) / dy)
+        elif dy < 0:
+            exit_length = min(exit_length, (self.y0 - y0) / dy)
+
+        exhaustive = length is not None and length + self.tol <= exit_length
+        length = length + self.tol if exhaustive else exit_length
+        x1, y1 = x0 + dx * length, y0 + dy * length
+
+        ci0, cj0 = self._cell(min(x0, x1), min(y0, y1))
+        ci1, cj1 = self._cell(max(x0, x1), max(y0, y1))
+        found = set()
+        for ci in range(ci0, ci1 + 1):
+            for cj in range(cj0, cj1 + 1):
+                idxs = self.cells.get((ci, cj))
+                if not idxs:
+                    continue
+                bx0, by0 = self.x0 + ci * self.cw, self.y0 + cj * self.ch
+                if _segment_hits_box(x0, y0, x1, y1, bx0 - self.tol, by0 - self.tol,
+                                     bx0 + self.cw + self.tol, by0 + self.ch + self.tol):
+                    found.update(idxs)
+        return [self.edges[idx] for idx in sorted(found)], exhaustive
+
+    def candidates_beyond(self, point, direction, length=None):
+        """
+        Original edges, in their original order, whose split region meets the part of the ray from
+        point along direction that lies outside the bounds (up to length, None for unbounded).
+        """
+        x0, y0 = point.x, point.y
+        d = abs(direction)
+        if not d:
+            return self.edges
+        dx, dy = direction.x / d, direction.y / d
+
+        tol = self.tol
+        limit = float('inf') if length is None else length + tol
+        result = []
+        for edge, planes in self.open_edges:
+            # the ray q(t) = point + t * (dx, dy) stays in each half-plane for c0 + c1 * t >= -tol
+            lo, hi = 0.0, limit
+            for px, py, vx, vy, sign in planes:
+                c0 = sign * (vx * (y0 - py) - vy * (x0 - px)) + tol
+                c1 = sign * (vx * dy - vy * dx)
+                if c1 > 0:
+                    t = -c0 / c1
+                    if t > lo:
+                        lo = t
+                elif c1 < 0:
+                    t = -c0 / c1
+                    if t < hi:
+                        hi = t
+                elif c0 < 0:
+                    hi = -1.0
+                if lo > hi:
+                    break
+            else:
+                x1, y1 = x0 + dx * hi, y0 + dy * hi
+                if hi == float('inf') or not (self._inside(x0 + dx * lo, y0 + dy * lo) and self._inside(x1, y1)):
+                    result.append(edge)
+        return result
+
+
 class _SLAV:
     def __init__(self, polygon, holes):
         contours = [_normalize_contour(polygon)]
-        contours.extend([_normalize_contour(hole) for hole in holes])
+        contours.extend([_normalize_contour(hole) for hole in holes or []])
 
+        # active vertices bordering each edge of the wavefront with their position on the LAV
+        # {_edge_key: {vertex: ('left' | 'right', position)}}, positions increase along each LAV
+        self._edge_vertices = {}
         self._lavs = [ _LAV.from_polygon(contour, self) for contour in contours ]
 
         # store original polygon edges for calculating split events
-        self._original_edges = [_OriginalEdge(LineSegment2(
+        self._original_edges = [_OriginalEdge.create(LineSegment2(
             vertex.prev.point, vertex.point), vertex.prev.bisector, vertex.bisector) for vertex in it.chain.from_iterable(self._lavs)]
+        self._edge_grid = _EdgeGrid(self._original_edges, it.chain.from_iterable(contours))
+
+    def register(self, vertex, position):
+        """Index an active vertex under the edges on its left and right"""
+        self._edge_vertices.setdefault(_edge_key(vertex.edge_right, vertex._dir_right), {})[vertex] = ('right', position)
+        self._edge_vertices.setdefault(_edge_key(vertex.edge_left, vertex._dir_left), {})[vertex] = ('left', position)
+
+    def unregister(self, vertex):
+        for key in (_edge_key(vertex.edge_left, vertex._dir_left), _edge_key(vertex.edge_right, vertex._dir_right)):
+            bucket = self._edge_vertices.get(key)
+            if bucket is not None:
+                bucket.pop(vertex, None)
+
+    def position(self, vertex):
+        """Position of an active vertex on its LAV"""
+        return self._edge_vertices[_edge_key(vertex.edge_left, vertex._dir_left)][vertex][1]
+
+    def _border_vertices(self, edge):
+        """
+        Active vertices with edge on their left or right, as (vertex, side), in the order a walk
+        over all LAVs would meet them
+        """
+        bucket = self._edge_vertices.get(_edge_key(edge))
+        if not bucket:
+            return []
+        found = [(v, side, pos) for v, (side, pos) in bucket.items() if v.lav is not None]
+        if len(found) < 2:
+            return [(v, side) for v, side, _ in found]
+
+        # LAVs in the order of self._lavs, on each LAV the walk starts at its head
+        lav_order = {}
+        heads = {}
+        for v, _, _ in found:
+            if id(v.lav) not in lav_order:
+                lav_order[id(v.lav)] = self._lavs.index(v.lav) if v.lav in self._lavs else -1
+                heads[id(v.lav)] = self.position(v.lav.head)
+
+        def key(item):
+            v, _, pos = item
+            return lav_order[id(v.lav)], pos < heads[id(v.lav)], pos
+
+        found.sort(key=key)
+        return [(v, side) for v, side, _ in found if lav_order[id(v.lav)] >= 0]
+
+    def split_candidates(self, vertex, bound=None):
+        """Original edges that may receive a split event from vertex within distance bound,
+        see _EdgeGrid.candidates"""
+        return self._edge_grid.candidates(vertex.point, vertex.bisector.v, bound)
+
+    def split_candidates_beyond(self, vertex, bound=None):
+        """Original edges that may receive a split event from vertex outside the polygon bounds,
+        see _EdgeGrid.candidates_beyond"""
+        return self._edge_grid.candidates_beyond(vertex.point, vertex.bisector.v, bound)
 
     def __iter__(self):
         for lav in self._lavs:
@@ -667,21 +1019,27 @@ class _SLAV:
         lav = event.vertex.lav
 
         sinks = [event.vertex.point]
+        ix, iy = event.intersection_point.x, event.intersection_point.y
         vertices = []
         x = None   # right vertex
         y = None   # left vertex
-        norm = event.opposite_edge.v.normalized()
-        for v in chain.from_iterable(self._lavs):
-            if norm == v.edge_left.v.normalized() and event.opposite_edge.p == v.edge_left.p:
+        for v, side in self._border_vertices(event.opposite_edge):
+            if side == 'left':
                 x = v
                 y = x.prev
-            elif norm == v.edge_right.v.normalized() and event.opposite_edge.p == v.edge_right.p:
+            else:
                 y=v
                 x=y.next
 
-            if x:
-                xleft = _cross(y.bisector.v.normalized(), (event.intersection_point - y.point).normalized())  >= 0
-                xright = _cross(x.bisector.v.normalized(), (event.intersection_point - x.point).normalized())  <=  0
+            if event.vertex in (x, y):
+                # an edge of the splitting vertex itself, relinking would cut its LAV open
+                x = None
+                y = None
+            elif x:
+                (ax, ay), (bx, by) = y._bisector_dir, _unit(ix - y._co[0], iy - y._co[1])
+                xleft = ax*by - bx*ay >= 0
+                (ax, ay), (bx, by) = x._bisector_dir, _unit(ix - x._co[0], iy - x._co[1])
+                xright = ax*by - bx*ay <= 0
 
                 if xleft and xright:
                     break
@@ -692,18 +1050,31 @@ class _SLAV:
         if x is None:
             return (None, [])
 
-        v1 = _LAVertex(event.intersection_point, event.vertex.edge_left, event.opposite_edge)
-        v2 = _LAVertex(event.intersection_point, event.opposite_edge, event.vertex.edge_right)
+        # the opposite edge may have shrunk to the point at one of its ends: a reflex vertex arriving
+        # there head on (a vertex event) leaves the wavefront together with the splitting vertex,
+        # each new vertex takes over its edge beyond the point
+        met = None
+        for v in (x, y):
+            if v.is_reflex and _coincident(_wavefront_point(v, event.distance), (ix, iy)):
+                met = v
+                sinks.append(v.point)
+                break
+        right, left = (x.next if met is x else x), (y.prev if met is y else y)
+
+        v1 = _LAVertex(event.intersection_point, event.vertex.edge_left,
+                       x.edge_right if met is x else event.opposite_edge)
+        v2 = _LAVertex(event.intersection_point, y.edge_left if met is y else event.opposite_edge,
+                       event.vertex.edge_right)
 
         v1.prev = event.vertex.prev
-        v1.next = x
+        v1.next = right
         event.vertex.prev.next = v1
-        x.prev = v1
+        right.prev = v1
 
-        v2.prev = y
+        v2.prev = left
         v2.next = event.vertex.next
         event.vertex.next.prev = v2
-        y.next = v2
+        left.next = v2
 
         new_lavs = None
         self._lavs.remove(lav)
@@ -730,6 +1101,8 @@ class _SLAV:
                 events.append(next_event)
 
         event.vertex.invalidate()
+        if met is not None:
+            met.invalidate()
         return (Subtree(event.intersection_point, event.distance, sinks), events)
 
 
@@ -742,10 +1115,11 @@ class _LAV:
     @classmethod
     def from_polygon(cls, polygon, slav):
         lav = cls(slav)
-        for prev, point, next in _window(polygon):
+        for position, (prev, point, next) in enumerate(_window(polygon)):
             lav._len += 1
             vertex = _LAVertex(point, LineSegment2(prev, point), LineSegment2(point, next))
             vertex.lav = lav
+            slav.register(vertex, position)
             if lav.head is None:
                 lav.head = vertex
                 vertex.prev = vertex.next = vertex
@@ -760,9 +1134,10 @@ class _LAV:
     def from_chain(cls, head, slav):
         lav = cls(slav)
         lav.head = head
-        for vertex in lav:
+        for position, vertex in enumerate(lav):
             lav._len += 1
             vertex.lav = lav
+            slav.register(vertex, position)
         return lav
 
     def invalidate(self, vertex):
@@ -771,11 +1146,14 @@ class _LAV:
         if self.head == vertex:
             self.head = self.head.next
         vertex.lav = None
+        self._slav.unregister(vertex)
 
     def unify(self, vertex_a, vertex_b, point):
         replacement = _LAVertex(point, vertex_a.edge_left, vertex_b.edge_right,
-                                (vertex_b.bisector.v.normalized(), vertex_a.bisector.v.normalized()))
+                                (vertex_b._bisector_dir, vertex_a._bisector_dir))
         replacement.lav = self
+        # vertex_b follows vertex_a, the replacement takes its place in the walk from the head
+        self._slav.register(replacement, self._slav.position(vertex_a))
 
         if self.head in [vertex_a, vertex_b]:
             self.head = replacement
@@ -806,7 +1184,7 @@ class _LAV:
             yield cur
             cur = cur.next
             if cur == self.head:
-                raise StopIteration
+                return
 
     def _show(self):
         cur = self.head
@@ -817,30 +1195,47 @@ class _LAV:
                 break
 
 
+class _QueueEntry:
+    """Heap entry ordering events like plain tuples, falling back to insertion order when
+    two events at the same distance cannot be compared (e.g. an edge against a vertex)"""
+    __slots__ = ['event', 'order']
+
+    def __init__(self, event, order):
+        self.event = event
+        self.order = order
+
+    def __lt__(self, other):
+        try:
+            return self.event < other.event
+        except TypeError:
+            return self.order < other.order
+
+
 class _EventQueue:
     def __init__(self):
         self.__data = []
+        self.__count = it.count()
 
     def put(self, item):
         if item is not None:
-            heapq.heappush(self.__data, item)
+            heapq.heappush(self.__data, _QueueEntry(item, next(self.__count)))
 
     def put_all(self, iterable):
         for item in iterable:
-            heapq.heappush(self.__data, item)
+            heapq.heappush(self.__data, _QueueEntry(item, next(self.__count)))
 
     def get(self):
-        return heapq.heappop(self.__data)
+        return heapq.heappop(self.__data).event
 
     def empty(self):
         return len(self.__data)==0
 
     def peek(self):
-        return self.__data[0]
+        return self.__data[0].event
 
     def show(self):
         for item in self.__data:
-            print(item)
+            print(item.event)
 
 
 def skeletonize(polygon, holes=None):
@@ -853,30 +1248,280 @@ def skeletonize(polygon, holes=None):
     Returns the straight skeleton as a list of "subtrees", which are in the form of (source, height, sinks),
     where source is the highest points, height is its height, and sinks are the point connected to the source.
     """
-    slav = _SLAV(polygon, holes)
-    output = []
-    prioque = _EventQueue()
-
-    for lav in slav:
-        for vertex in lav:
-            v = vertex.next_event()
-            prioque.put(v)
-
-    while not (prioque.empty() or slav.empty()):
-        i = prioque.get()
-        if isinstance(i, _EdgeEvent):
-            if not i.vertex_a.is_valid or not i.vertex_b.is_valid:
-                continue
+    return list(iter_skeleton(polygon, holes))
 
-            (arc, events) = slav.handle_edge_event(i)
-        elif isinstance(i, _SplitEvent):
-            if not i.vertex.is_valid:
-                continue
-            (arc, events) = slav.handle_split_event(i)
 
-        prioque.put_all(events)
+def iter_skeleton(polygon, holes=None, max_height=None):
+    """
+    Generator version of skeletonize, yielding each subtree as soon as its event is processed.
+
+    Subtrees come in the order their events leave the queue, i.e. by height. With max_height given,
+    processing stops before the first event above it, so only the part of the skeleton swept by the
+    wavefront up to that offset is computed.
+    """
+    return Wavefront(polygon, holes).advance(max_height)
+
+
+class Wavefront:
+    """
+    The skeleton event loop as a wavefront moving inwards from the polygon, which can be stopped at
+    any offset distance and resumed later. Contours at several distances share one event schedule:
+
+        front = Wavefront(polygon)
+        inner = [front.contours(d) for d in (0.1, 0.5, 2.0)]
+
+    Polygon and holes follow the conventions of skeletonize.
+    """
+
+    def __init__(self, polygon, holes=None):
+        self._slav = _SLAV(polygon, holes)
+        self._queue = _EventQueue()
+        self.distance = 0.0
+
+        for lav in self._slav:
+            for vertex in lav:
+                self._queue.put(vertex.next_event())
+
+    def advance(self, max_height=None):
+        """Process events up to max_height (all if None), yielding the subtrees they produce"""
+        slav = self._slav
+        prioque = self._queue
+        while not (prioque.empty() or slav.empty()):
+            if max_height is not None and prioque.peek().distance > max_height:
+                break
+            i = prioque.get()
+            if isinstance(i, _EdgeEvent):
+                if not i.vertex_a.is_valid or not i.vertex_b.is_valid:
+                    continue
+                if i.vertex_a.next is not i.vertex_b:
+                    # a split in between relinked them, their new neighbours have events of their own
+                    continue
+
+                (arc, events) = slav.handle_edge_event(i)
+            elif isinstance(i, _SplitEvent):
+                if not i.vertex.is_valid:
+                    continue
+                (arc, events) = slav.handle_split_event(i)
+
+            prioque.put_all(events)
+
+            if arc is not None:
+                self.distance = max(self.distance, arc.height)
+                yield arc
+
+        if max_height is not None:
+            self.distance = max(self.distance, max_height)
+
+    def contours(self, distance):
+        """
+        Offset contours of the polygon at distance, as lists of (x, y) in the orientation of the input.
+        The wavefront only moves forward, distance can not be less than one asked for before.
+        """
+        if distance < self.distance:
+            raise ValueError("Wavefront is already at {}, can not go back to {}".format(self.distance, distance))
+        for _ in self.advance(distance):
+            pass
+
+        result = []
+        for lav in self._slav:
+            # vertices of a split meet in one point until their edge grows, keep one of them
+            contour = []
+            for point in (_wavefront_point(vertex, distance) for vertex in lav):
+                if not contour or not _coincident(contour[-1], point):
+                    contour.append(point)
+            if len(contour) > 1 and _coincident(contour[0], contour[-1]):
+                contour.pop()
+            if len(contour) > 2:
+                result.append(contour)
+        return result
+
+
+def _coincident(a, b):
+    return _distance(a[0], a[1], b[0], b[1]) <= 1e-9 * (1 + abs(a[0]) + abs(a[1]))
+
+
+def _wavefront_point(vertex, distance):
+    """Position of vertex once the wavefront is at distance, moving along its bisector"""
+    x, y = vertex._co
+    el = vertex.edge_left
+    height = _line_distance(x, y, el.p.x, el.p.y, el.v.x, el.v.y)
+    bx, by = vertex._bisector_dir
+    lx, ly = vertex._dir_left
+    speed = abs(bx * ly - by * lx)
+    if not speed:
+        return x, y
+    step = (distance - height) / speed
+    return x + bx * step, y + by * step
+
+
+def offset_polygon(polygon, distance, holes=None):
+    """Contours of polygon shrunk inwards by distance, see Wavefront.contours"""
+    return Wavefront(polygon, holes).contours(distance)
+
+
+def offset_polygons(polygon, distances, holes=None):
+    """Offset contours at each of distances (in the given order), computed on one Wavefront"""
+    front = Wavefront(polygon, holes)
+    result = {d: front.contours(d) for d in sorted(set(distances))}
+    return [result[d] for d in distances]
+
+
+def _canonical_frame(contour, precision):
+    """
+    Start vertex and rotation (cos, sin) that bring contour into its canonical pose:
+    the start vertex at the origin and its outgoing edge along +x.
+    Of all start vertices the one giving the smallest quantized contour is chosen.
+    """
+    n = len(contour)
+    edges = [(contour[(i + 1) % n][0] - contour[i][0], contour[(i + 1) % n][1] - contour[i][1]) for i in range(n)]
+    lengths = [math.sqrt(dx ** 2 + dy ** 2) for dx, dy in edges]
+
+    # cheap rotation invariant signature to narrow down the start vertices worth comparing
+    signature = [(round(lengths[i], precision), round(lengths[i - 1], precision),
+                  round(edges[i - 1][0] * edges[i][1] - edges[i - 1][1] * edges[i][0], precision))
+                 for i in range(n)]
+    first = min(signature[i] for i in range(n) if lengths[i])
+    best = None
+    for i in range(n):
+        if signature[i] != first:
+            continue
+        c, s = edges[i][0] / lengths[i], edges[i][1] / lengths[i]
+        pose = _transform(contour, i, contour[i], c, s, precision)
+        if best is None or pose < best[0]:
+            best = (pose, i, c, s)
+    return best
+
+
+def _transform(contour, start, origin, c, s, precision):
+    """Contour starting at vertex start, moved by -origin, rotated by (c, -s) and quantized"""
+    n = len(contour)
+    ox, oy = origin
+    result = []
+    for k in range(n):
+        x, y = contour[(start + k) % n]
+        x, y = x - ox, y - oy
+        result.append((round(c * x + s * y, precision), round(c * y - s * x, precision)))
+    return tuple(result)
+
+
+class SkeletonCache:
+    """
+    LRU cache in front of skeletonize for footprints that repeat at different positions and rotations.
+
+    Polygons are keyed by their canonical pose (see _canonical_frame) quantized to precision decimals,
+    the skeleton of that pose is stored and moved back onto the polygon on every hit.
+    Sinks on the input contours are returned as the caller's own points.
+    """
+
+    def __init__(self, maxsize=256, precision=6):
+        self.maxsize = maxsize
+        self.precision = precision
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+
+    def __len__(self):
+        return len(self._data)
+
+    def clear(self):
+        self._data.clear()
+        self.hits = self.misses = 0
+
+    def info(self):
+        return {'hits': self.hits, 'misses': self.misses, 'size': len(self._data), 'maxsize': self.maxsize}
+
+    def skeletonize(self, polygon, holes=None):
+        polygon = [(float(x), float(y)) for x, y in polygon]
+        holes = [[(float(x), float(y)) for x, y in hole] for hole in holes or []]
+        if len(polygon) < 3 or not any(a != b for a, b in zip(polygon, polygon[1:] + polygon[:1])):
+            return skeletonize(polygon, holes)
+
+        _, start, c, s = _canonical_frame(polygon, self.precision)
+        origin = polygon[start]
+
+        # contours in canonical pose, holes from their smallest vertex and sorted
+        key = [_transform(polygon, start, origin, c, s, self.precision)]
+        points = [polygon[(start + k) % len(polygon)] for k in range(len(polygon))]
+        posed = []
+        for hole in holes:
+            pose = _transform(hole, 0, origin, c, s, self.precision)
+            first = pose.index(min(pose))
+            posed.append((pose[first:] + pose[:first], hole[first:] + hole[:first]))
+        posed.sort(key=lambda item: item[0])
+        key.extend(pose for pose, _ in posed)
+        for _, hole in posed:
+            points.extend(hole)
+        key = tuple(key)
+
+        if key in self._data:
+            self.hits += 1
+            self._data.move_to_end(key)
+            arcs = self._data[key]
+        else:
+            self.misses += 1
+            arcs = self._canonical_skeleton(key)
+            self._data[key] = arcs
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+        ox, oy = origin
+        def place(x, y):
+            return Point2(ox + c * x - s * y, oy + s * x + c * y)
+
+        return [Subtree(place(*source), height,
+                        [Point2(*points[sink]) if isinstance(sink, int) else place(*sink) for sink in sinks])
+                for source, height, sinks in arcs]
 
-        if arc is not None:
-            output.append(arc)
+    def _canonical_skeleton(self, key):
+        """Skeleton of the canonical contours, sinks on a contour stored as the index of that vertex"""
+        vertices = {}
+        for idx, point in enumerate(it.chain.from_iterable(key)):
+            vertices.setdefault(point, idx)
+        arcs = []
+        for arc in skeletonize(list(key[0]), [list(hole) for hole in key[1:]]):
+            sinks = [vertices.get((p.x, p.y), (p.x, p.y)) for p in arc.sinks]
+            arcs.append(((arc.source.x, arc.source.y), arc.height, sinks))
+        return arcs
 
-    return output
+
+_skeleton_cache = SkeletonCache()
+
+
+def cached_skeletonize(polygon, holes=None):
+    """skeletonize through the module wide SkeletonCache"""
+    return _skeleton_cache.skeletonize(polygon, holes)
+
+
+def skeleton_cache():
+    return _skeleton_cache
+
+
+def _skeleton_chunk(chunk):
+    """Skeletons of a chunk of (polygon, holes) as plain tuples, run in a worker process"""
+    return [[((arc.source.x, arc.source.y), arc.height, [(p.x, p.y) for p in arc.sinks])
+             for arc in cached_skeletonize(polygon, holes)] for polygon, holes in chunk]
+
+
+def _subtrees(arcs):
+    return [Subtree(Point2(*source), height, [Point2(*p) for p in sinks]) for source, height, sinks in arcs]
+
+
+def skeletonize_many(polygons, workers=None, chunksize=32, executor=None):
+    """
+    Skeletons of many polygons computed across a process pool, yielded in input order.
+
+    polygons is an iterable of (polygon, holes) and is consumed lazily, see util_pool.map_chunks.
+    Each worker keeps its own SkeletonCache. workers=1 runs in this process.
+    Workers import this module by its top-level name, not through the add-on package, so the pool
+    does not need bpy; it is meant for scripts outside Blender and is not used by the operators.
+    """
+    try:
+        from .util_pool import map_chunks
+    except ImportError:
+        # loaded on its own (see benchmarks/bench_skeleton.py), util_pool sits next to this file
+        path = os.path.dirname(os.path.abspath(__file__))
+        if path not in sys.path:
+            sys.path.append(path)
+        from util_pool import map_chunks
+    for arcs in map_chunks(_skeleton_chunk, polygons, workers, chunksize, executor):
+        yield _subtrees(arcs)